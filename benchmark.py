@@ -0,0 +1,185 @@
+import os
+import gc
+import json
+import time
+import timeit
+import tracemalloc
+import asyncio
+import argparse
+import tempfile
+from typing import Callable, Dict, List, Tuple
+
+import bot
+from mock_server import MockBlockStreetServer, MockConfig
+
+class TimedAPI(bot.BlockStreetAPI):
+    """BlockStreetAPI that records the latency of every request"""
+    latencies: List[float] = []
+
+    async def _send_request(self, method: str, endpoint: str, **kwargs) -> Dict:
+        started = time.perf_counter()
+        try:
+            return await super()._send_request(method, endpoint, **kwargs)
+        finally:
+            TimedAPI.latencies.append(time.perf_counter() - started)
+
+def synthetic_wallets(count: int) -> List[bot.Wallet]:
+    """Deterministic throwaway wallets"""
+    return [bot.Wallet(idx.to_bytes(32, 'big'), f'B{idx}') for idx in range(1, count + 1)]
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+def build_specs(operation: str) -> List[bot.OperationSpec]:
+    amount = bot.RandomAmount(0.001, 0.0015)
+    if operation == 'auto_all':
+        return bot.auto_all_specs()
+    if operation == 'swap':
+        return [bot.OperationSpec('swap', bot.OwnedSwapPair(), amount)]
+    return [bot.OperationSpec(operation, bot.RandomToken(), amount)]
+
+async def run_benchmark(args: argparse.Namespace) -> Dict:
+    server = MockBlockStreetServer(MockConfig(args.latency, args.jitter, args.error_rate,
+                                              args.rate_limit_rate, args.retry_after, args.seed))
+    base_url = await server.start()
+
+    bot.BlockStreetAPI.BASE_URL = base_url
+    bot.PerformanceConfig.DELAY_MIN = bot.PerformanceConfig.DELAY_MAX = args.delay
+    bot.PerformanceConfig.PACING = args.pacing
+    bot.SecurityConfig.MAX_TRANSACTIONS_PER_HOUR = max(bot.SecurityConfig.MAX_TRANSACTIONS_PER_HOUR, 10 ** 6)
+    session_dir = tempfile.mkdtemp(prefix='blockstreet-bench-')
+    bot.SessionCache._shared = bot.SessionCache(os.path.join(session_dir, 'sessions.json'))
+    bot.RunJournal._shared = bot.RunJournal(os.path.join(session_dir, 'journal.db'))
+
+    if args.quiet:
+        bot.Logger.configure(console=False)
+    wallets = synthetic_wallets(args.wallets)
+    TimedAPI.latencies = []
+    try:
+        async with bot.BlockStreetAPI(wallets[0]) as api:
+            await api.ensure_session('benchmark')
+            token_list = await api.get_token_list()
+
+        pipeline = bot.OperationPipeline(build_specs(args.operation), token_list, 'benchmark', args.tx_count,
+                                         executor=bot.WalletExecutor(args.concurrency), seed=args.seed,
+                                         api_class=TimedAPI)
+        started = time.perf_counter()
+        stats = await pipeline.run(wallets, [], 'Benchmark')
+        bot.Logger.flush()
+        wall_time = time.perf_counter() - started
+    finally:
+        await bot.ConnectionPool.shared().close()
+        await server.stop()
+
+    latencies = TimedAPI.latencies
+    return {
+        'operation': args.operation,
+        'wallets': args.wallets,
+        'tx_count': args.tx_count,
+        'concurrency': args.concurrency,
+        'ops_ok': stats.ops_ok,
+        'ops_failed': stats.ops_failed,
+        'ops_skipped': stats.ops_skipped,
+        'requests': len(latencies),
+        'wall_time_s': round(wall_time, 3),
+        'ops_per_sec': round((stats.ops_ok + stats.ops_failed) / wall_time, 2) if wall_time else 0.0,
+        'requests_per_sec': round(len(latencies) / wall_time, 2) if wall_time else 0.0,
+        'latency_p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'latency_p99_ms': round(percentile(latencies, 99) * 1000, 2),
+    }
+
+def traced(build: Callable) -> Tuple[object, int]:
+    """Run build() and return its result with the bytes it left allocated"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = build()
+        gc.collect()
+        return result, tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+def per_call_ns(func: Callable, items: list) -> float:
+    loops = 5
+    return min(timeit.repeat(lambda: func(items), number=1, repeat=loops)) * 1e9 / len(items)
+
+def run_records_benchmark(count: int) -> Dict:
+    """Memory and access cost of plain dicts versus the slotted records, per item"""
+    keys = [idx.to_bytes(32, 'big') for idx in range(1, count + 1)]
+    addresses = [f'0x{idx:040x}' for idx in range(1, count + 1)]
+    supply_json = json.dumps([{'symbol': f'T{idx % 10}', 'amount': str(0.05 + idx * 1e-9)} for idx in range(count)])
+    token_json = json.dumps([{'symbol': f'T{idx}', 'price': str(1 + idx * 1e-6)} for idx in range(count)])
+    
+    def dict_wallets():
+        return [{'name': f'B{idx}', 'private_key': key, 'fingerprint': bot.key_fingerprint(key), 'address': address}
+                for idx, (key, address) in enumerate(zip(keys, addresses))]
+    
+    def record_wallets():
+        return [bot.Wallet(key, f'B{idx}', address=address) for idx, (key, address) in enumerate(zip(keys, addresses))]
+    
+    _, old_wallet_bytes = traced(dict_wallets)
+    _, new_wallet_bytes = traced(record_wallets)
+    old_supplies, old_supply_bytes = traced(lambda: json.loads(supply_json))
+    new_supplies, new_supply_bytes = traced(lambda: bot.SupplyPosition.parse_list(json.loads(supply_json)))
+    old_tokens, old_token_bytes = traced(lambda: json.loads(token_json))
+    new_tokens, new_token_bytes = traced(lambda: bot.Token.parse_list(json.loads(token_json)))
+    
+    # Reads done per operation: owned supplies for token choice, prices for quotes
+    old_supply_ns = per_call_ns(lambda ss: [s['symbol'] for s in ss if s and float(s.get('amount', 0)) > 0], old_supplies)
+    new_supply_ns = per_call_ns(lambda ss: [s.symbol for s in ss if s.amount > 0], new_supplies)
+    old_token_ns = per_call_ns(lambda ts: [float(t.get('price', 1)) for t in ts], old_tokens)
+    new_token_ns = per_call_ns(lambda ts: [t.price for t in ts], new_tokens)
+    
+    return {
+        'items': count,
+        'wallet_bytes_dict': round(old_wallet_bytes / count, 1),
+        'wallet_bytes_record': round(new_wallet_bytes / count, 1),
+        'supply_bytes_dict': round(old_supply_bytes / count, 1),
+        'supply_bytes_record': round(new_supply_bytes / count, 1),
+        'token_bytes_dict': round(old_token_bytes / count, 1),
+        'token_bytes_record': round(new_token_bytes / count, 1),
+        'supply_access_ns_dict': round(old_supply_ns, 1),
+        'supply_access_ns_record': round(new_supply_ns, 1),
+        'token_access_ns_dict': round(old_token_ns, 1),
+        'token_access_ns_record': round(new_token_ns, 1),
+    }
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='End-to-end throughput benchmark against the local mock API')
+    parser.add_argument('--wallets', type=int, default=100)
+    parser.add_argument('--tx-count', type=int, default=3)
+    parser.add_argument('--operation', default='auto_all',
+                        choices=['auto_all', 'swap', 'supply', 'withdraw', 'borrow', 'repay'])
+    parser.add_argument('--concurrency', type=int, default=bot.PerformanceConfig.MAX_CONCURRENT_WALLETS)
+    parser.add_argument('--delay', type=float, default=0.0, help='pacing delay between operations in seconds')
+    parser.add_argument('--pacing', default='fixed', choices=['fixed', 'adaptive'],
+                        help='fixed sleeps --delay; adaptive starts there and follows the PACING_* settings')
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--jitter', type=float, default=0.02)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0)
+    parser.add_argument('--retry-after', type=float, default=1.0)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--quiet', action='store_true', help='hide per-operation log output')
+    parser.add_argument('--records', type=int, metavar='N',
+                        help='instead of a run, compare dicts and slotted records for N wallets/tokens/supplies')
+    parser.add_argument('--json', action='store_true', help='print the result as JSON')
+    return parser.parse_args(argv)
+
+def main():
+    args = parse_args()
+    result = run_records_benchmark(args.records) if args.records else asyncio.run(run_benchmark(args))
+    if args.json:
+        print(json.dumps(result))
+        return
+    print(f"\n{bot.Colors.CYAN}{'═' * 60}{bot.Colors.RESET}")
+    for key, value in result.items():
+        print(f"  {key:<18} {bot.Colors.GREEN}{value}{bot.Colors.RESET}")
+    print(f"{bot.Colors.CYAN}{'═' * 60}{bot.Colors.RESET}")
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,32 @@
 import os
+import re
 import sys
 import time
 import json
 import random
+import sqlite3
+import hashlib
+import bisect
+import heapq
+import queue
 import asyncio
+import threading
+import contextlib
+import cProfile
+import types
+import multiprocessing
+import argparse
+import functools
+import aiohttp
+from aiohttp import web
 import requests
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, List, Dict, Optional, Tuple
 from eth_account import Account
 from eth_account.messages import encode_defunct
 from dotenv import load_dotenv
@@ -33,52 +52,227 @@ class SecurityConfig:
     MAX_TRANSACTIONS_PER_HOUR = 100
     REQUIRE_CONFIRMATION = False
 
+class PerformanceConfig:
+    """Throughput tuning for multi-wallet runs"""
+    MAX_CONCURRENT_WALLETS = int(os.getenv('MAX_CONCURRENT_WALLETS', '5'))
+    SESSION_CACHE_FILE = os.getenv('SESSION_CACHE_FILE', 'sessions.json')
+    SESSION_TTL = int(os.getenv('SESSION_TTL', str(6 * 3600)))
+    SIGNING_WORKERS = int(os.getenv('SIGNING_WORKERS', '0'))
+    PLAN_SEED = int(os.environ['PLAN_SEED']) if os.getenv('PLAN_SEED') else None
+    TOKEN_CACHE_FILE = os.getenv('TOKEN_CACHE_FILE', 'token_cache.json')
+    TOKEN_CACHE_TTL = int(os.getenv('TOKEN_CACHE_TTL', '300'))
+    DELAY_MIN = float(os.getenv('DELAY_MIN', '5'))
+    DELAY_MAX = float(os.getenv('DELAY_MAX', '10'))
+    PACING = os.getenv('PACING', 'adaptive')
+    PACING_FLOOR = float(os.getenv('PACING_FLOOR', '1'))
+    PACING_CEILING = float(os.getenv('PACING_CEILING', '60'))
+    PACING_LIMITS = os.getenv('PACING_LIMITS', '')
+    PACING_STEP = float(os.getenv('PACING_STEP', '0.5'))
+    PACING_BACKOFF = float(os.getenv('PACING_BACKOFF', '2'))
+    PACING_SLOW_LATENCY = float(os.getenv('PACING_SLOW_LATENCY', '2'))
+    REQUEST_RETRIES = int(os.getenv('REQUEST_RETRIES', '3'))
+    BACKOFF_BASE = float(os.getenv('BACKOFF_BASE', '0.5'))
+    BACKOFF_MAX = float(os.getenv('BACKOFF_MAX', '30'))
+    BREAKER_THRESHOLD = int(os.getenv('BREAKER_THRESHOLD', '5'))
+    BREAKER_COOLDOWN = float(os.getenv('BREAKER_COOLDOWN', '30'))
+    ENDPOINT_RATE_LIMIT = float(os.getenv('ENDPOINT_RATE_LIMIT', '0'))
+    ENDPOINT_BURST = int(os.getenv('ENDPOINT_BURST', '10'))
+    AUTO_ALL_PERIOD = float(os.getenv('AUTO_ALL_PERIOD', str(24 * 3600)))
+    AUTO_ALL_SPREAD = float(os.getenv('AUTO_ALL_SPREAD', str(24 * 3600)))
+    AUTO_ALL_JITTER = float(os.getenv('AUTO_ALL_JITTER', '900'))
+    AUTO_ALL_COUNTDOWN = os.getenv('AUTO_ALL_COUNTDOWN', '1') != '0'
+    POOL_LIMIT = int(os.getenv('POOL_LIMIT', '100'))
+    POOL_LIMIT_PER_HOST = int(os.getenv('POOL_LIMIT_PER_HOST', '20'))
+    POOL_KEEPALIVE = float(os.getenv('POOL_KEEPALIVE', '30'))
+    ADDRESS_CACHE_FILE = os.getenv('ADDRESS_CACHE_FILE', 'address_cache.json')
+    JOURNAL_FILE = os.getenv('JOURNAL_FILE', 'journal.db')
+    JOURNAL_RESUME_WINDOW = float(os.getenv('JOURNAL_RESUME_WINDOW', str(24 * 3600)))
+    SHARDS = int(os.getenv('SHARDS', '1'))
+    METRICS_FILE = os.getenv('METRICS_FILE') or None
+    METRICS_PORT = int(os.getenv('METRICS_PORT', '0'))
+    SIMULATE = os.getenv('SIMULATE', '0') != '0'
+    SIM_SEED = int(os.getenv('SIM_SEED', '1'))
+    SIM_LATENCY = float(os.getenv('SIM_LATENCY', '0.05'))
+    SIM_JITTER = float(os.getenv('SIM_JITTER', '0.02'))
+    SIM_ERROR_RATE = float(os.getenv('SIM_ERROR_RATE', '0'))
+    SIM_RATE_LIMIT_RATE = float(os.getenv('SIM_RATE_LIMIT_RATE', '0'))
+    PROFILE = os.getenv('PROFILE', '0') != '0'
+    PROFILE_WALLET = os.getenv('PROFILE_WALLET') or None
+    PROFILE_DIR = os.getenv('PROFILE_DIR', 'profiles')
+    PROFILE_INTERVAL = float(os.getenv('PROFILE_INTERVAL', '0.005'))
+
+WIB_TIMEZONE = timezone(timedelta(hours=7))
+
+class LogBackend:
+    """Queues log records and writes them from a background thread
+
+    Records go to the colored console and, optionally, to a JSON-lines
+    file with wallet/operation/latency/outcome fields. Writing happens in
+    batches off the event loop; flush() waits until everything queued so
+    far has been written.
+    """
+    
+    BATCH_SIZE = 256
+    STYLES = {
+        'info': (Colors.BLUE, ''),
+        'success': (Colors.GREEN, '✅ '),
+        'error': (Colors.RED, '❌ '),
+        'warning': (Colors.YELLOW, '⚡ '),
+        'process': (Colors.MAGENTA, '🔄 '),
+        'security': (Colors.RED, '🔐 '),
+    }
+    
+    def __init__(self, buffered: bool = True, console: bool = True, json_path: Optional[str] = None):
+        self.buffered = buffered
+        self.console = console
+        self.json_file = None
+        self.queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        if json_path:
+            self.open_json(json_path)
+    
+    def open_json(self, path: str):
+        """Start writing JSON-lines records to path (appending)"""
+        self.flush()
+        if self.json_file is not None:
+            self.json_file.close()
+        self.json_file = open(path, 'a', encoding='utf-8')
+    
+    def emit(self, record: tuple):
+        if not self.buffered:
+            self._write([record])
+            return
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='log-writer', daemon=True)
+                    self._thread.start()
+        self.queue.put(record)
+    
+    def flush(self):
+        if self._thread is not None:
+            self.queue.join()
+    
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            try:
+                while len(batch) < self.BATCH_SIZE:
+                    batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                pass
+            try:
+                self._write(batch)
+            except Exception:
+                pass
+            for _ in batch:
+                self.queue.task_done()
+    
+    def _write(self, batch: List[tuple]):
+        with Profiler.shared().phase('log'):
+            if self.console:
+                sys.stdout.write(''.join(self._format_console(record) for record in batch))
+                sys.stdout.flush()
+            if self.json_file is not None:
+                lines = [self._format_json(record) for record in batch if record[1] != 'raw']
+                if lines:
+                    self.json_file.write(''.join(lines))
+                    self.json_file.flush()
+    
+    def _format_console(self, record: tuple) -> str:
+        created, level, wallet, msg, fields = record
+        if level == 'raw':
+            return f'{msg}\n'
+        timestamp = datetime.fromtimestamp(created, WIB_TIMEZONE).strftime("%H:%M:%S")
+        color, icon = self.STYLES[level]
+        label = 'SECURITY' if level == 'security' else (wallet or 'SYS')
+        return f"{Colors.GRAY}{timestamp}{Colors.RESET} {color}[{label}]{Colors.RESET} {icon}{msg}\n"
+    
+    @staticmethod
+    def _format_json(record: tuple) -> str:
+        created, level, wallet, msg, fields = record
+        entry = {
+            'ts': datetime.fromtimestamp(created, timezone.utc).isoformat(),
+            'level': level,
+            'wallet': wallet,
+            'msg': msg,
+        }
+        entry.update(fields)
+        return json.dumps(entry, ensure_ascii=False) + '\n'
+
 class Logger:
-    """Enhanced logger with custom formatting"""
+    """Enhanced logger with custom formatting
+
+    Extra keyword fields (operation, latency_ms, outcome, ...) are kept in
+    the JSON-lines sink and ignored by the console.
+    """
+    
+    backend = LogBackend(
+        buffered=os.getenv('LOG_BUFFERED', '1') != '0',
+        json_path=os.getenv('LOG_JSON_FILE') or None
+    )
     
     @staticmethod
     def clear_terminal():
+        Logger.flush()
         os.system('clear' if os.name != 'nt' else 'cls')
     
     @staticmethod
-    def _get_timestamp():
-        wib_timezone = timezone(timedelta(hours=7))
-        return datetime.now(wib_timezone).strftime("%H:%M:%S")
+    def configure(buffered: Optional[bool] = None, console: Optional[bool] = None, json_path: Optional[str] = None):
+        """Adjust the logging backend at runtime"""
+        backend = Logger.backend
+        backend.flush()
+        if buffered is not None:
+            backend.buffered = buffered
+        if console is not None:
+            backend.console = console
+        if json_path:
+            backend.open_json(json_path)
+    
+    @staticmethod
+    def flush():
+        """Wait until all queued records have been written"""
+        Logger.backend.flush()
+    
+    @staticmethod
+    def prompt(text: str) -> str:
+        """Flush pending output, then read a line from the user"""
+        Logger.flush()
+        return input(text)
+    
+    @staticmethod
+    def _log(level: str, wallet: Optional[str], msg: str, fields: Dict):
+        Logger.backend.emit((time.time(), level, wallet, msg, fields))
+    
+    @staticmethod
+    def raw(text: str):
+        """Write preformatted console text in order with log records"""
+        Logger._log('raw', None, text, {})
     
     @staticmethod
-    def info(wallet: Optional[str], msg: str):
-        timestamp = Logger._get_timestamp()
-        wallet_display = wallet or 'SYS'
-        print(f"{Colors.GRAY}{timestamp}{Colors.RESET} {Colors.BLUE}[{wallet_display}]{Colors.RESET} {msg}")
+    def info(wallet: Optional[str], msg: str, **fields):
+        Logger._log('info', wallet, msg, fields)
     
     @staticmethod
-    def success(wallet: Optional[str], msg: str):
-        timestamp = Logger._get_timestamp()
-        wallet_display = wallet or 'SYS'
-        print(f"{Colors.GRAY}{timestamp}{Colors.RESET} {Colors.GREEN}[{wallet_display}]{Colors.RESET} ✅ {msg}")
+    def success(wallet: Optional[str], msg: str, **fields):
+        Logger._log('success', wallet, msg, fields)
     
     @staticmethod
-    def error(wallet: Optional[str], msg: str):
-        timestamp = Logger._get_timestamp()
-        wallet_display = wallet or 'SYS'
-        print(f"{Colors.GRAY}{timestamp}{Colors.RESET} {Colors.RED}[{wallet_display}]{Colors.RESET} ❌ {msg}")
+    def error(wallet: Optional[str], msg: str, **fields):
+        Logger._log('error', wallet, msg, fields)
     
     @staticmethod
-    def warning(wallet: Optional[str], msg: str):
-        timestamp = Logger._get_timestamp()
-        wallet_display = wallet or 'SYS'
-        print(f"{Colors.GRAY}{timestamp}{Colors.RESET} {Colors.YELLOW}[{wallet_display}]{Colors.RESET} ⚡ {msg}")
+    def warning(wallet: Optional[str], msg: str, **fields):
+        Logger._log('warning', wallet, msg, fields)
     
     @staticmethod
-    def process(wallet: Optional[str], msg: str):
-        timestamp = Logger._get_timestamp()
-        wallet_display = wallet or 'SYS'
-        print(f"{Colors.GRAY}{timestamp}{Colors.RESET} {Colors.MAGENTA}[{wallet_display}]{Colors.RESET} 🔄 {msg}")
+    def process(wallet: Optional[str], msg: str, **fields):
+        Logger._log('process', wallet, msg, fields)
     
     @staticmethod
-    def security(msg: str):
-        timestamp = Logger._get_timestamp()
-        print(f"{Colors.GRAY}{timestamp}{Colors.RESET} {Colors.RED}[SECURITY]{Colors.RESET} 🔐 {msg}")
+    def security(msg: str, **fields):
+        Logger._log('security', None, msg, fields)
 
 def display_banner():
     """Display application banner"""
@@ -93,6 +287,7 @@ def display_banner():
 
 def display_menu():
     """Display main menu"""
+    Logger.flush()
     print(f"\n{Colors.CYAN}╔════════════════════ MAIN MENU ════════════════════╗{Colors.RESET}")
     print(f"{Colors.GREEN}  [1]{Colors.RESET} Auto Swap          {Colors.GREEN}[6]{Colors.RESET} Repay Loan")
     print(f"{Colors.GREEN}  [2]{Colors.RESET} Manual Swap        {Colors.GREEN}[7]{Colors.RESET} Auto All Operations")
@@ -102,12 +297,172 @@ def display_menu():
     print(f"{Colors.CYAN}╚════════════════════════════════════════════════════╝{Colors.RESET}")
     print(f"{Colors.RED}  [0]{Colors.RESET} Exit Bot\n")
 
+SECP256K1_ORDER = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+
+def parse_private_key(text: str) -> bytes:
+    """32-byte private key from hex (with or without 0x)"""
+    if text.startswith('0x') or text.startswith('0X'):
+        text = text[2:]
+    key = bytes.fromhex(text)
+    if len(key) != 32 or not 0 < int.from_bytes(key, 'big') < SECP256K1_ORDER:
+        raise ValueError('invalid private key')
+    return key
+
+def key_fingerprint(private_key: bytes) -> str:
+    """Stable identifier for a key that does not reveal it"""
+    return hashlib.sha256(b'blockstreet-address:' + private_key).hexdigest()[:32]
+
+class AddressCache:
+    """Addresses derived from private keys, keyed by key fingerprint"""
+    
+    FLUSH_INTERVAL = 5.0
+    _shared: Optional['AddressCache'] = None
+    
+    def __init__(self, filename: Optional[str] = None):
+        self.filename = filename if filename is not None else PerformanceConfig.ADDRESS_CACHE_FILE
+        self._addresses: Dict[str, str] = self._load()
+        self._dirty = False
+        self._last_flush = time.monotonic()
+    
+    @classmethod
+    def shared(cls) -> 'AddressCache':
+        """Process-wide cache instance"""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+    
+    def _load(self) -> Dict[str, str]:
+        if not self.filename or not Path(self.filename).exists():
+            return {}
+        try:
+            with open(self.filename, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            Logger.warning(None, f'Ignoring unreadable address cache: {str(e)}')
+            return {}
+    
+    def get(self, fingerprint: str) -> Optional[str]:
+        return self._addresses.get(fingerprint)
+    
+    def put(self, fingerprint: str, address: str):
+        if self._addresses.get(fingerprint) != address:
+            self._addresses[fingerprint] = address
+            self._dirty = True
+            if time.monotonic() - self._last_flush >= self.FLUSH_INTERVAL:
+                self.flush()
+    
+    def flush(self):
+        """Write the cache to disk if it changed"""
+        if not self._dirty or not self.filename:
+            return
+        try:
+            tmp_name = f'{self.filename}.tmp'
+            with open(tmp_name, 'w') as f:
+                json.dump(self._addresses, f)
+            os.replace(tmp_name, self.filename)
+            self._dirty = False
+        except Exception as e:
+            Logger.warning(None, f'Failed to save address cache: {str(e)}')
+        self._last_flush = time.monotonic()
+
+class Wallet:
+    """One configured wallet; the address and account are derived only when first needed
+
+    Slotted, and only the address is kept after deriving it (an account
+    object per wallet dominates memory on large runs), so a wallet costs a
+    couple of hundred bytes however many are loaded.
+    """
+    
+    __slots__ = ('name', 'private_key', 'fingerprint', 'address_cache', '_address', '_account')
+    
+    def __init__(self, private_key: bytes, name: str, address_cache: Optional[AddressCache] = None,
+                 address: Optional[str] = None):
+        self.name = name
+        self.private_key = private_key
+        self.fingerprint = key_fingerprint(private_key)
+        self.address_cache = address_cache
+        self._account = None
+        if address is None and address_cache is not None:
+            address = address_cache.get(self.fingerprint)
+        self._address = address
+    
+    @property
+    def has_address(self) -> bool:
+        return self._address is not None
+    
+    @property
+    def address(self) -> str:
+        if self._address is None:
+            self.set_address(Account.from_key(self.private_key).address)
+        return self._address
+    
+    @property
+    def account(self):
+        if self._account is None:
+            self._account = Account.from_key(self.private_key)
+            if self._address is None:
+                self.set_address(self._account.address)
+        return self._account
+    
+    def set_address(self, address: str):
+        self._address = address
+        if self.address_cache is not None:
+            self.address_cache.put(self.fingerprint, address)
+
+class Token:
+    """A listed token, with its price converted once when the list is parsed"""
+    
+    __slots__ = ('symbol', 'price')
+    
+    def __init__(self, symbol: str, price: float = 1.0):
+        self.symbol = symbol
+        self.price = price
+    
+    @classmethod
+    def parse_list(cls, items: Optional[List[Dict]]) -> List['Token']:
+        """Tokens from a /swap/token_list response (or a saved snapshot)"""
+        return [cls(str(t['symbol']), float(t.get('price', 1))) for t in items or [] if t and 'symbol' in t]
+    
+    def to_dict(self) -> Dict:
+        return {'symbol': self.symbol, 'price': self.price}
+    
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Token) and self.symbol == other.symbol and self.price == other.price
+    
+    def __hash__(self) -> int:
+        return hash((self.symbol, self.price))
+    
+    def __repr__(self) -> str:
+        return f'Token({self.symbol!r}, {self.price!r})'
+
+class SupplyPosition:
+    """One supplied asset, with its amount converted once when the response is parsed"""
+    
+    __slots__ = ('symbol', 'amount')
+    
+    def __init__(self, symbol: str, amount: float):
+        self.symbol = symbol
+        self.amount = amount
+    
+    @classmethod
+    def parse_list(cls, items: Optional[List[Dict]]) -> List['SupplyPosition']:
+        """Positions from a /my/supply response"""
+        return [cls(str(s['symbol']), float(s.get('amount', 0))) for s in items or [] if s and 'symbol' in s]
+    
+    def __repr__(self) -> str:
+        return f'SupplyPosition({self.symbol!r}, {self.amount!r})'
+
 class WalletManager:
     """Secure wallet management"""
     
     @staticmethod
-    def load_wallets_from_file(filename: str = 'private_keys.txt') -> List[Dict]:
-        """Load wallets from file with validation"""
+    def load_wallets_from_file(filename: str = 'private_keys.txt') -> List[Wallet]:
+        """Load wallets from file with validation
+
+        The file is streamed line by line and no key is derived here:
+        addresses come from the AddressCache when known and are otherwise
+        derived on first use (or in bulk by LoginSigner.precompute).
+        """
         wallets = []
         
         if not Path(filename).exists():
@@ -115,42 +470,41 @@ class WalletManager:
             Logger.info(None, f'Create {filename} with format: privatekey:wallet_name')
             return wallets
         
+        address_cache = AddressCache.shared()
         try:
             with open(filename, 'r') as f:
-                lines = f.readlines()
-            
-            for idx, line in enumerate(lines, 1):
-                line = line.strip()
-                if not line or line.startswith('#'):
-                    continue
-                
-                try:
-                    parts = line.split(':')
-                    private_key = parts[0].strip()
-                    name = parts[1].strip() if len(parts) > 1 else f'W{idx}'
-                    
-                    if not private_key.startswith('0x'):
-                        private_key = '0x' + private_key
-                    
-                    account = Account.from_key(private_key)
+                for idx, line in enumerate(f, 1):
+                    line = line.strip()
+                    if not line or line.startswith('#'):
+                        continue
                     
-                    wallets.append({
-                        'account': account,
-                        'name': name,
-                        'address': account.address
-                    })
+                    try:
+                        parts = line.split(':')
+                        private_key = parse_private_key(parts[0].strip())
+                        name = parts[1].strip() if len(parts) > 1 else f'W{idx}'
+                        wallets.append(Wallet(private_key, name, address_cache))
                     
-                except Exception as e:
-                    Logger.warning(None, f'Invalid wallet config at line {idx}')
+                    except Exception as e:
+                        Logger.warning(None, f'Invalid wallet config at line {idx}')
             
             if wallets:
-                Logger.success(None, f'Successfully loaded {len(wallets)} wallet(s)')
+                cached = sum(1 for w in wallets if w.has_address)
+                Logger.success(None, f'Successfully loaded {len(wallets)} wallet(s)'
+                                     + (f' ({cached} address(es) cached)' if cached else ''))
         
         except Exception as e:
             Logger.error(None, f'Failed to read configuration: {str(e)}')
         
         return wallets
     
+    @staticmethod
+    def synthetic_wallets(count: int) -> List[Wallet]:
+        """Deterministic throwaway wallets (private keys 1..count) for simulated runs"""
+        address_cache = AddressCache.shared()
+        wallets = [Wallet(idx.to_bytes(32, 'big'), f'SIM{idx}', address_cache) for idx in range(1, count + 1)]
+        Logger.success(None, f'Generated {len(wallets)} synthetic wallet(s)')
+        return wallets
+    
     @staticmethod
     def validate_transaction_amount(amount: float) -> bool:
         """Validate transaction amount against security limits"""
@@ -299,6 +653,969 @@ class CaptchaSolver:
         except Exception as e:
             raise Exception(f'2Captcha error: {str(e)}')
 
+def parse_sign_in_fields(text: str) -> Dict[str, str]:
+    """Extract nonce and timestamps from a sign-in message"""
+    nonce_match = re.search(r'Nonce:\s*([^\n\r]+)', text)
+    issued_match = re.search(r'Issued At:\s*([^\n\r]+)', text)
+    expiration_match = re.search(r'Expiration Time:\s*([^\n\r]+)', text)
+    return {
+        'nonce': nonce_match.group(1).strip() if nonce_match else 'Z9YFj5VY80yTwN3n',
+        'issuedAt': issued_match.group(1).strip() if issued_match else datetime.now().isoformat(),
+        'expirationTime': expiration_match.group(1).strip() if expiration_match else datetime.now().isoformat(),
+    }
+
+class AuthenticationError(Exception):
+    """Raised when the server rejects the current session"""
+
+class SessionCache:
+    """Persists gfsessionid cookies per wallet address with an expiry"""
+    
+    FLUSH_INTERVAL = 5.0
+    _shared: Optional['SessionCache'] = None
+    
+    def __init__(self, filename: Optional[str] = None, ttl: Optional[int] = None, read_only: bool = False):
+        self.filename = filename if filename is not None else PerformanceConfig.SESSION_CACHE_FILE
+        self.ttl = ttl if ttl is not None else PerformanceConfig.SESSION_TTL
+        self.read_only = read_only
+        self._sessions: Dict[str, Dict] = self._load()
+        self._dirty = False
+        self._last_flush = 0.0
+    
+    @classmethod
+    def shared(cls) -> 'SessionCache':
+        """Process-wide cache instance"""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+    
+    def _load(self) -> Dict[str, Dict]:
+        if not self.filename or not Path(self.filename).exists():
+            return {}
+        try:
+            with open(self.filename, 'r') as f:
+                data = json.load(f)
+            now = time.time()
+            return {addr: s for addr, s in data.items() if s.get('expires_at', 0) > now}
+        except Exception as e:
+            Logger.warning(None, f'Ignoring unreadable session cache: {str(e)}')
+            return {}
+    
+    def get(self, address: str) -> Optional[str]:
+        """Return a cached cookie if it has not expired"""
+        entry = self._sessions.get(address.lower())
+        if not entry:
+            return None
+        if entry['expires_at'] <= time.time():
+            self.invalidate(address)
+            return None
+        return entry['cookie']
+    
+    def put(self, address: str, cookie: str):
+        self._sessions[address.lower()] = {'cookie': cookie, 'expires_at': time.time() + self.ttl}
+        self._mark_dirty()
+    
+    def invalidate(self, address: str):
+        if self._sessions.pop(address.lower(), None) is not None:
+            self._mark_dirty()
+    
+    def _mark_dirty(self):
+        self._dirty = True
+        if time.monotonic() - self._last_flush >= self.FLUSH_INTERVAL:
+            self.flush()
+    
+    def entries(self) -> Dict[str, Dict]:
+        return dict(self._sessions)
+    
+    def merge(self, entries: Dict[str, Dict]):
+        """Adopt sessions recorded by another process"""
+        for address, entry in entries.items():
+            if self._sessions.get(address) != entry:
+                self._sessions[address] = entry
+                self._dirty = True
+        self.flush()
+    
+    def flush(self):
+        """Write the cache to disk if it changed"""
+        if not self._dirty or self.read_only or not self.filename:
+            return
+        try:
+            tmp_name = f'{self.filename}.tmp'
+            with open(tmp_name, 'w') as f:
+                json.dump(self._sessions, f)
+            os.replace(tmp_name, self.filename)
+            self._dirty = False
+        except Exception as e:
+            Logger.warning(None, f'Failed to save session cache: {str(e)}')
+        self._last_flush = time.monotonic()
+
+class RunJournal:
+    """Append-only SQLite journal of completed operations, used to resume runs
+
+    Each completed operation is stored under a scope with its plan step and
+    sequence number. One-off runs use a per-run scope that is reused while
+    the run is unfinished, so a crashed run picks up where it stopped. Daily
+    runs (Auto All) use a shared scope and look back over a time window, so
+    a restart does not repeat work that was already done that day.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS runs (
+            run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            label TEXT NOT NULL,
+            fingerprint TEXT NOT NULL,
+            started_at REAL NOT NULL,
+            finished_at REAL
+        );
+        CREATE TABLE IF NOT EXISTS operations (
+            scope TEXT NOT NULL,
+            address TEXT NOT NULL,
+            step INTEGER NOT NULL,
+            seq INTEGER NOT NULL,
+            operation TEXT NOT NULL,
+            recorded_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS operations_by_wallet ON operations (scope, address, recorded_at);
+    """
+    _shared: Optional['RunJournal'] = None
+    
+    def __init__(self, filename: Optional[str] = None):
+        self.filename = filename or PerformanceConfig.JOURNAL_FILE
+        self.db = sqlite3.connect(self.filename)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.executescript(self.SCHEMA)
+    
+    @classmethod
+    def shared(cls) -> Optional['RunJournal']:
+        """Process-wide journal, or None when JOURNAL_FILE is empty"""
+        if cls._shared is None and PerformanceConfig.JOURNAL_FILE:
+            cls._shared = cls()
+        return cls._shared
+    
+    def begin(self, label: str, fingerprint: str) -> Tuple[str, bool]:
+        """Return (scope, resumed) for a one-off run, reusing an unfinished one"""
+        since = time.time() - PerformanceConfig.JOURNAL_RESUME_WINDOW
+        row = self.db.execute(
+            'SELECT run_id FROM runs WHERE label = ? AND fingerprint = ? AND finished_at IS NULL AND started_at > ? '
+            'ORDER BY run_id DESC LIMIT 1', (label, fingerprint, since)).fetchone()
+        if row:
+            return f'run:{row[0]}', True
+        with self.db:
+            cursor = self.db.execute('INSERT INTO runs (label, fingerprint, started_at) VALUES (?, ?, ?)',
+                                     (label, fingerprint, time.time()))
+        return f'run:{cursor.lastrowid}', False
+    
+    def finish(self, scope: str):
+        if scope.startswith('run:'):
+            with self.db:
+                self.db.execute('UPDATE runs SET finished_at = ? WHERE run_id = ?', (time.time(), int(scope[4:])))
+    
+    def completed(self, scope: str, address: str, since: float = 0.0) -> set:
+        """(step, seq) pairs already completed for this wallet"""
+        rows = self.db.execute('SELECT step, seq FROM operations WHERE scope = ? AND address = ? AND recorded_at > ?',
+                               (scope, address.lower(), since))
+        return set(rows)
+    
+    def record(self, scope: str, address: str, step: int, seq: int, operation: str):
+        with self.db:
+            self.db.execute('INSERT INTO operations (scope, address, step, seq, operation, recorded_at) '
+                            'VALUES (?, ?, ?, ?, ?, ?)', (scope, address.lower(), step, seq, operation, time.time()))
+    
+    @staticmethod
+    def fingerprint(plan: 'TradePlan', wallets: List[Wallet]) -> str:
+        """Identifies the same run (operations, counts, tokens, amounts and wallets) across restarts"""
+        digest = hashlib.sha256()
+        for step in plan.steps:
+            spec = step.spec
+            digest.update(f'{spec.name}:{step.count}:{spec.token_policy!r}:{spec.amount_policy!r};'.encode())
+        for wallet_data in wallets:
+            digest.update(wallet_data.fingerprint.encode())
+        return digest.hexdigest()
+    
+    def close(self):
+        self.db.close()
+
+class TokenBucket:
+    """Token bucket that hands out waits instead of refusals
+
+    acquire() always takes a token; when the bucket is empty the balance
+    goes negative and the caller sleeps exactly until its token has been
+    refilled, so concurrent callers are served in arrival order.
+    """
+    
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+    
+    def reserve(self) -> float:
+        """Take one token; returns the seconds to wait before using it"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return -self.tokens / self.rate if self.tokens < 0 else 0.0
+    
+    async def acquire(self) -> float:
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+class RateLimiter:
+    """Process-wide token buckets per wallet and per endpoint
+
+    Wallet buckets enforce MAX_TRANSACTIONS_PER_HOUR for each address and
+    outlive individual BlockStreetAPI objects. Endpoint buckets pace all
+    requests to one endpoint when ENDPOINT_RATE_LIMIT is set.
+    """
+    
+    LONG_WAIT = 5.0
+    _shared: Optional['RateLimiter'] = None
+    
+    def __init__(self, wallet_per_hour: Optional[int] = None, endpoint_rate: Optional[float] = None,
+                 endpoint_burst: Optional[int] = None):
+        self.wallet_per_hour = wallet_per_hour or SecurityConfig.MAX_TRANSACTIONS_PER_HOUR
+        self.endpoint_rate = PerformanceConfig.ENDPOINT_RATE_LIMIT if endpoint_rate is None else endpoint_rate
+        self.endpoint_burst = endpoint_burst or PerformanceConfig.ENDPOINT_BURST
+        self.wallets: Dict[str, TokenBucket] = {}
+        self.endpoints: Dict[str, TokenBucket] = {}
+    
+    @classmethod
+    def shared(cls) -> 'RateLimiter':
+        """Process-wide limiter instance"""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+    
+    async def for_wallet(self, address: str, name: Optional[str] = None) -> float:
+        """Wait for a transaction slot for this wallet"""
+        key = address.lower()
+        bucket = self.wallets.get(key)
+        if bucket is None:
+            bucket = self.wallets[key] = TokenBucket(self.wallet_per_hour / 3600, self.wallet_per_hour)
+        wait = bucket.reserve()
+        if wait >= self.LONG_WAIT:
+            Logger.security(f'Rate limit reached for {name or address}, waiting {wait:.0f}s')
+        return await self._sleep(wait)
+    
+    async def for_endpoint(self, endpoint: str) -> float:
+        """Wait for a request slot on this endpoint (no-op when unlimited)"""
+        if self.endpoint_rate <= 0:
+            return 0.0
+        bucket = self.endpoints.get(endpoint)
+        if bucket is None:
+            bucket = self.endpoints[endpoint] = TokenBucket(self.endpoint_rate, self.endpoint_burst)
+        return await self._sleep(bucket.reserve())
+    
+    @staticmethod
+    async def _sleep(wait: float) -> float:
+        if wait > 0:
+            await asyncio.sleep(wait)
+            Metrics.shared().observe_throttle(wait)
+        return wait
+
+class Histogram:
+    """Cumulative-bucket latency histogram in the Prometheus layout"""
+    
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+    
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+    
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.BUCKETS, value)] += 1
+        self.total += value
+        self.count += 1
+    
+    def merge(self, counts: List[int], total: float, count: int):
+        self.counts = [a + b for a, b in zip(self.counts, counts)]
+        self.total += total
+        self.count += count
+    
+    def render(self, name: str, labels: str) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.BUCKETS + ('+Inf',), self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_sum{{{labels}}} {self.total:.6f}')
+        lines.append(f'{name}_count{{{labels}}} {self.count}')
+        return lines
+
+class Metrics:
+    """Per-endpoint request latency, status codes and pacing sleep time
+
+    Exported in the Prometheus text format, either rewritten to a file
+    every few seconds or served from a local /metrics endpoint.
+    """
+    
+    EXPORT_INTERVAL = 5.0
+    _shared: Optional['Metrics'] = None
+    
+    def __init__(self):
+        self.requests: Dict[Tuple[str, str], Histogram] = {}
+        self.statuses: Dict[Tuple[str, str], int] = {}
+        self.operations: Dict[str, Histogram] = {}
+        self.outcomes: Dict[Tuple[str, str], int] = {}
+        self.sleep_seconds = 0.0
+        self.throttle_seconds = 0.0
+        self.backoff_seconds = 0.0
+        self.network_seconds = 0.0
+        self.started_at = time.time()
+        self.shard_snapshots: Dict[int, Dict] = {}
+        self._export_task: Optional[asyncio.Task] = None
+        self._runner: Optional[web.AppRunner] = None
+        self._export_file: Optional[str] = None
+    
+    @classmethod
+    def shared(cls) -> 'Metrics':
+        """Process-wide metrics registry"""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+    
+    def observe_request(self, method: str, endpoint: str, status: str, seconds: float):
+        key = (method, endpoint)
+        histogram = self.requests.get(key)
+        if histogram is None:
+            histogram = self.requests[key] = Histogram()
+        histogram.observe(seconds)
+        self.network_seconds += seconds
+        status_key = (endpoint, status)
+        self.statuses[status_key] = self.statuses.get(status_key, 0) + 1
+    
+    def observe_operation(self, operation: str, outcome: str, seconds: float):
+        histogram = self.operations.get(operation)
+        if histogram is None:
+            histogram = self.operations[operation] = Histogram()
+        histogram.observe(seconds)
+        key = (operation, outcome)
+        self.outcomes[key] = self.outcomes.get(key, 0) + 1
+    
+    def observe_skip(self, operation: str):
+        """Count an operation dropped before it reached the network"""
+        key = (operation, 'skipped')
+        self.outcomes[key] = self.outcomes.get(key, 0) + 1
+    
+    def observe_sleep(self, seconds: float):
+        self.sleep_seconds += seconds
+    
+    def observe_throttle(self, seconds: float):
+        self.throttle_seconds += seconds
+    
+    def observe_backoff(self, seconds: float):
+        self.backoff_seconds += seconds
+    
+    def snapshot(self) -> Dict:
+        """Plain-data copy of the counters, for sending between processes"""
+        return {
+            'requests': [(key, h.counts, h.total, h.count) for key, h in self.requests.items()],
+            'statuses': list(self.statuses.items()),
+            'operations': [(key, h.counts, h.total, h.count) for key, h in self.operations.items()],
+            'outcomes': list(self.outcomes.items()),
+            'seconds': (self.sleep_seconds, self.throttle_seconds, self.backoff_seconds, self.network_seconds),
+        }
+    
+    def merge(self, snapshot: Dict):
+        """Add the counters of a snapshot to this registry"""
+        for table, items in ((self.requests, snapshot['requests']), (self.operations, snapshot['operations'])):
+            for key, counts, total, count in items:
+                key = tuple(key) if isinstance(key, list) else key
+                histogram = table.get(key)
+                if histogram is None:
+                    histogram = table[key] = Histogram()
+                histogram.merge(counts, total, count)
+        for table, items in ((self.statuses, snapshot['statuses']), (self.outcomes, snapshot['outcomes'])):
+            for key, count in items:
+                key = tuple(key)
+                table[key] = table.get(key, 0) + count
+        sleep, throttle, backoff, network = snapshot['seconds']
+        self.sleep_seconds += sleep
+        self.throttle_seconds += throttle
+        self.backoff_seconds += backoff
+        self.network_seconds += network
+    
+    def combined(self) -> 'Metrics':
+        """This process's counters plus the latest snapshot of every shard"""
+        if not self.shard_snapshots:
+            return self
+        view = Metrics()
+        view.started_at = self.started_at
+        view.merge(self.snapshot())
+        for snapshot in self.shard_snapshots.values():
+            view.merge(snapshot)
+        return view
+    
+    def render(self) -> str:
+        return self.combined()._render()
+    
+    def _render(self) -> str:
+        lines = [
+            '# HELP blockstreet_request_duration_seconds API request latency by endpoint',
+            '# TYPE blockstreet_request_duration_seconds histogram',
+        ]
+        for (method, endpoint), histogram in sorted(self.requests.items()):
+            lines += histogram.render('blockstreet_request_duration_seconds', f'method="{method}",endpoint="{endpoint}"')
+        lines += [
+            '# HELP blockstreet_requests_total API responses by endpoint and HTTP status',
+            '# TYPE blockstreet_requests_total counter',
+        ]
+        for (endpoint, status), count in sorted(self.statuses.items()):
+            lines.append(f'blockstreet_requests_total{{endpoint="{endpoint}",status="{status}"}} {count}')
+        lines += [
+            '# HELP blockstreet_operation_duration_seconds Operation latency including retries',
+            '# TYPE blockstreet_operation_duration_seconds histogram',
+        ]
+        for operation, histogram in sorted(self.operations.items()):
+            lines += histogram.render('blockstreet_operation_duration_seconds', f'operation="{operation}"')
+        lines += [
+            '# HELP blockstreet_operations_total Operations by outcome',
+            '# TYPE blockstreet_operations_total counter',
+        ]
+        for (operation, outcome), count in sorted(self.outcomes.items()):
+            lines.append(f'blockstreet_operations_total{{operation="{operation}",outcome="{outcome}"}} {count}')
+        lines += [
+            '# HELP blockstreet_network_seconds_total Time spent waiting on API requests',
+            '# TYPE blockstreet_network_seconds_total counter',
+            f'blockstreet_network_seconds_total {self.network_seconds:.6f}',
+            '# HELP blockstreet_sleep_seconds_total Time spent in pacing delays between operations',
+            '# TYPE blockstreet_sleep_seconds_total counter',
+            f'blockstreet_sleep_seconds_total {self.sleep_seconds:.6f}',
+            '# HELP blockstreet_throttle_seconds_total Time spent waiting on the rate limiter',
+            '# TYPE blockstreet_throttle_seconds_total counter',
+            f'blockstreet_throttle_seconds_total {self.throttle_seconds:.6f}',
+            '# HELP blockstreet_backoff_seconds_total Time spent backing off before request retries',
+            '# TYPE blockstreet_backoff_seconds_total counter',
+            f'blockstreet_backoff_seconds_total {self.backoff_seconds:.6f}',
+            '# HELP blockstreet_uptime_seconds Seconds since metrics collection started',
+            '# TYPE blockstreet_uptime_seconds gauge',
+            f'blockstreet_uptime_seconds {time.time() - self.started_at:.3f}',
+        ]
+        return '\n'.join(lines) + '\n'
+    
+    def write(self, filename: Optional[str] = None):
+        """Atomically rewrite the metrics text file"""
+        filename = filename or self._export_file
+        if not filename:
+            return
+        try:
+            tmp_name = f'{filename}.tmp'
+            with open(tmp_name, 'w') as f:
+                f.write(self.render())
+            os.replace(tmp_name, filename)
+        except Exception as e:
+            Logger.warning(None, f'Failed to write metrics: {str(e)}')
+    
+    async def start_export(self, filename: Optional[str] = None, port: Optional[int] = None, host: str = '127.0.0.1'):
+        """Start the file writer and/or the HTTP endpoint"""
+        if filename:
+            self._export_file = filename
+            self._export_task = asyncio.create_task(self._export_loop())
+        if port:
+            app = web.Application()
+            app.router.add_get('/metrics', self._handle_metrics)
+            self._runner = web.AppRunner(app, access_log=None)
+            await self._runner.setup()
+            await web.TCPSite(self._runner, host, port).start()
+            Logger.info(None, f'Metrics available at http://{host}:{port}/metrics')
+    
+    async def _export_loop(self):
+        while True:
+            await asyncio.sleep(self.EXPORT_INTERVAL)
+            self.write()
+    
+    async def _handle_metrics(self, request: web.Request) -> web.Response:
+        return web.Response(text=self.render(), content_type='text/plain', charset='utf-8')
+    
+    async def stop_export(self):
+        if self._export_task is not None:
+            self._export_task.cancel()
+            try:
+                await self._export_task
+            except asyncio.CancelledError:
+                pass
+            self._export_task = None
+        self.write()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+class PhaseTimer:
+    """Adds the wall time of one `with` block to a phase's [calls, seconds, max] totals"""
+    
+    __slots__ = ('totals', 'started')
+    
+    def __init__(self, totals: List[float]):
+        self.totals = totals
+    
+    def __enter__(self):
+        self.started = time.perf_counter()
+    
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.started
+        totals = self.totals
+        totals[0] += 1
+        totals[1] += elapsed
+        if elapsed > totals[2]:
+            totals[2] = elapsed
+
+class StackSampler:
+    """Samples one thread's stack into collapsed ("folded") stacks
+
+    Every interval the thread's current stack is counted as
+    `outer;...;inner`, the input format of flamegraph.pl, inferno and
+    speedscope. Samples are only kept while `active` is set and, where the
+    platform exposes per-thread CPU clocks, only if the thread used CPU
+    since the previous sample, so idle waits in the event loop don't bury
+    the work.
+    """
+    
+    def __init__(self, interval: float, thread_id: Optional[int] = None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.active = True
+        self.stacks: Dict[str, int] = {}
+        self._labels: Dict[Any, str] = {}
+        self._clock = time.pthread_getcpuclockid(self.thread_id) if hasattr(time, 'pthread_getcpuclockid') else None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+    
+    def _run(self):
+        cpu = time.clock_gettime(self._clock) if self._clock is not None else None
+        while not self._stop.wait(self.interval):
+            if self._clock is not None:
+                last, cpu = cpu, time.clock_gettime(self._clock)
+                if cpu == last:
+                    continue
+            if not self.active:
+                continue
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                names.append(self._label(frame.f_code))
+                frame = frame.f_back
+            if names:
+                key = ';'.join(reversed(names))
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+    
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+        return label
+    
+    def write(self, filename: str):
+        with open(filename, 'w') as f:
+            f.writelines(f'{stack} {count}\n' for stack, count in sorted(self.stacks.items()))
+
+class Profiler:
+    """Opt-in profiling: per-phase timers plus cProfile and collapsed-stack dumps
+
+    Phases (load_wallets, login, fetch, plan, execute, log) add up calls
+    and wall seconds. Wallets run concurrently, so the totals of phases that
+    await can exceed the run's wall time; plan and log are synchronous and
+    their totals are CPU. The log phase is timed in the log writer thread.
+
+    The dumps cover the event-loop thread for the whole run or, with a
+    wallet named, only the steps of that wallet's task. `.prof` files load
+    in snakeviz, tuna, flameprof or pstats; `.folded` files in flamegraph.pl,
+    inferno or speedscope. No `.folded` file is written when the sampler
+    caught nothing, which is common for a single wallet: its steps rarely
+    hold the CPU across a sampling tick.
+    """
+    
+    PHASES = ('load_wallets', 'login', 'fetch', 'plan', 'execute', 'log')
+    NULL_PHASE = contextlib.nullcontext()
+    _shared: Optional['Profiler'] = None
+    
+    def __init__(self, enabled: Optional[bool] = None, wallet: Optional[str] = None, directory: Optional[str] = None):
+        self.wallet = wallet if wallet is not None else PerformanceConfig.PROFILE_WALLET
+        self.enabled = (PerformanceConfig.PROFILE or self.wallet is not None) if enabled is None else enabled
+        self.directory = directory or PerformanceConfig.PROFILE_DIR
+        self.phases: Dict[str, List[float]] = {name: [0, 0.0, 0.0] for name in self.PHASES}
+        self.matched = False
+        self.suffix = ''
+        self.files: List[str] = []
+        self._profile: Optional[cProfile.Profile] = None
+        self._sampler: Optional[StackSampler] = None
+        self._result: Optional[Dict] = None
+    
+    @classmethod
+    def shared(cls) -> 'Profiler':
+        """Process-wide profiler; disabled unless PROFILE or PROFILE_WALLET is set"""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+    
+    def phase(self, name: str):
+        """Context manager timing one span of a phase (a no-op while disabled)"""
+        return PhaseTimer(self.phases[name]) if self.enabled else self.NULL_PHASE
+    
+    def start(self, suffix: str = ''):
+        """Begin collecting the dumps"""
+        if not self.enabled or self._profile is not None:
+            return
+        self.suffix = suffix
+        self._profile = cProfile.Profile()
+        self._sampler = StackSampler(PerformanceConfig.PROFILE_INTERVAL)
+        if self.wallet is None:
+            self._profile.enable()
+        else:
+            self._sampler.active = False
+        self._sampler.start()
+    
+    def watches(self, wallet_data: Wallet) -> bool:
+        if self._profile is None or self.wallet is None:
+            return False
+        wanted = self.wallet.lower()
+        return wanted == wallet_data.name.lower() or wanted == wallet_data.address.lower()
+    
+    def wrap(self, worker):
+        """Wrap a WalletExecutor worker so the named wallet's task is profiled"""
+        if self._profile is None or self.wallet is None:
+            return worker
+        
+        async def profiled_worker(idx: int, wallet_data: Wallet, proxy: Optional[str], stats: 'ExecutionStats'):
+            if not self.watches(wallet_data):
+                return await worker(idx, wallet_data, proxy, stats)
+            self.matched = True
+            return await self._profiled(worker(idx, wallet_data, proxy, stats))
+        return profiled_worker
+    
+    @types.coroutine
+    def _profiled(self, coro):
+        # Drive the coroutine step by step with the profiler on only while it runs
+        steps = coro.__await__()
+        value, error = None, None
+        while True:
+            self._profile.enable()
+            self._sampler.active = True
+            try:
+                yielded = steps.send(value) if error is None else steps.throw(error)
+            except StopIteration as e:
+                return e.value
+            finally:
+                self._sampler.active = False
+                self._profile.disable()
+            try:
+                value, error = (yield yielded), None
+            except BaseException as e:
+                value, error = None, e
+    
+    def snapshot(self) -> Dict[str, List[float]]:
+        return {name: list(totals) for name, totals in self.phases.items()}
+    
+    def merge(self, phases: Dict[str, List[float]], files: Optional[List[str]] = None):
+        """Add another process's phase totals (a shard's snapshot) and the dumps it wrote"""
+        self.files += files or []
+        for name, (calls, seconds, longest) in phases.items():
+            totals = self.phases[name]
+            totals[0] += calls
+            totals[1] += seconds
+            totals[2] = max(totals[2], longest)
+    
+    def report(self) -> Dict[str, Dict]:
+        return {name: {'calls': int(calls), 'total_s': round(seconds, 3),
+                       'mean_ms': round(seconds / calls * 1000, 3), 'max_ms': round(longest * 1000, 3)}
+                for name, (calls, seconds, longest) in self.phases.items() if calls}
+    
+    def finish(self, log_phases: bool = True) -> Optional[Dict]:
+        """Stop collecting, write the files and return the phases and file names
+
+        Safe to call more than once; later calls return the first result.
+        """
+        if not self.enabled:
+            return None
+        if self._result is not None:
+            return self._result
+        files = []
+        if self._profile is not None:
+            self._profile.disable()
+            self._sampler.stop()
+            if self.wallet is None or self.matched:
+                files = self._write_dumps()
+        result = self._result = {'phases': self.report(), 'files': self.files + files}
+        for name, phase in (result['phases'].items() if log_phases else ()):
+            Logger.info(None, f"Phase {name}: {phase['calls']} call(s), {phase['total_s']:.3f}s total, "
+                              f"{phase['mean_ms']:.2f} ms mean, {phase['max_ms']:.2f} ms max")
+        if files:
+            Logger.info(None, f"Profile written to {', '.join(files)}")
+        return result
+    
+    def _write_dumps(self) -> List[str]:
+        label = 'wallet-' + re.sub(r'[^\w.-]', '_', self.wallet) if self.wallet else 'run'
+        base = os.path.join(self.directory, f"{label}-{datetime.now().strftime('%Y%m%d-%H%M%S')}{self.suffix}")
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            files = [f'{base}.prof']
+            self._profile.dump_stats(f'{base}.prof')
+            if self._sampler.stacks:
+                files.append(f'{base}.folded')
+                self._sampler.write(f'{base}.folded')
+            files.append(f'{base}.phases.json')
+            with open(f'{base}.phases.json', 'w') as f:
+                json.dump(self.report(), f, indent=2)
+        except Exception as e:
+            Logger.warning(None, f'Failed to write profile: {str(e)}')
+            return []
+        return files
+
+class ConnectionPool:
+    """Keep-alive aiohttp sessions shared by every wallet on the same proxy route
+
+    Sessions use a DummyCookieJar, so nothing leaks between wallets: each
+    BlockStreetAPI sends its own gfsessionid cookie with every request.
+    Sessions belong to the event loop that created them and are rebuilt
+    if a new loop starts using the pool.
+    """
+    
+    _shared: Optional['ConnectionPool'] = None
+    
+    def __init__(self, limit: Optional[int] = None, limit_per_host: Optional[int] = None,
+                 keepalive: Optional[float] = None):
+        self.limit = limit or PerformanceConfig.POOL_LIMIT
+        self.limit_per_host = limit_per_host or PerformanceConfig.POOL_LIMIT_PER_HOST
+        self.keepalive = keepalive or PerformanceConfig.POOL_KEEPALIVE
+        self.sessions: Dict[Optional[str], aiohttp.ClientSession] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    @classmethod
+    def shared(cls) -> 'ConnectionPool':
+        """Process-wide pool registry"""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+    
+    def session(self, proxy: Optional[str]) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self.sessions = {}
+            self._loop = loop
+        session = self.sessions.get(proxy)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host,
+                                             keepalive_timeout=self.keepalive)
+            session = self.sessions[proxy] = aiohttp.ClientSession(
+                connector=connector,
+                cookie_jar=aiohttp.DummyCookieJar(),
+                timeout=aiohttp.ClientTimeout(total=30)
+            )
+        return session
+    
+    async def close(self):
+        """Close every pooled session (call once at shutdown)"""
+        sessions, self.sessions = list(self.sessions.values()), {}
+        for session in sessions:
+            if not session.closed:
+                await session.close()
+
+class TransientError(Exception):
+    """A request failure that may succeed if retried"""
+    
+    def __init__(self, message: str, status: Optional[int] = None, retry_after: Optional[float] = None, sent: bool = True):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+        self.sent = sent
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After header as seconds (delta-seconds or HTTP-date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """Full-jitter exponential backoff, never shorter than Retry-After"""
+    ceiling = min(PerformanceConfig.BACKOFF_MAX, PerformanceConfig.BACKOFF_BASE * 2 ** attempt)
+    delay = random.uniform(0, ceiling)
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, PerformanceConfig.BACKOFF_MAX))
+    return delay
+
+class CircuitBreaker:
+    """Per-host breaker that pauses every wallet while the API is failing
+
+    After BREAKER_THRESHOLD consecutive transient failures the breaker
+    opens for BREAKER_COOLDOWN seconds. Then a single probe request is let
+    through; its outcome closes the breaker or opens it again (for the
+    Retry-After time on a 429). A probe that ends any other way, e.g.
+    cancelled, hands the probe on to the next waiting request.
+    """
+    
+    _breakers: Dict[str, 'CircuitBreaker'] = {}
+    
+    def __init__(self, host: str, threshold: Optional[int] = None, cooldown: Optional[float] = None):
+        self.host = host
+        self.threshold = threshold or PerformanceConfig.BREAKER_THRESHOLD
+        self.cooldown = cooldown if cooldown is not None else PerformanceConfig.BREAKER_COOLDOWN
+        self.failures = 0
+        self.open_until = 0.0
+        self.probing = False
+    
+    @classmethod
+    def for_url(cls, url: str) -> 'CircuitBreaker':
+        host = urlsplit(url).netloc
+        breaker = cls._breakers.get(host)
+        if breaker is None:
+            breaker = cls._breakers[host] = cls(host)
+        return breaker
+    
+    @property
+    def is_open(self) -> bool:
+        return self.open_until > 0
+    
+    async def wait(self) -> bool:
+        """Block while the breaker is open; let one probe through afterwards
+
+        Returns True for the probe, whose caller must call end_probe() once
+        the request is over, however it ended.
+        """
+        while self.is_open:
+            remaining = self.open_until - time.monotonic()
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+                continue
+            if not self.probing:
+                self.probing = True
+                return True
+            await asyncio.sleep(min(1.0, self.cooldown))
+        return False
+    
+    def end_probe(self):
+        self.probing = False
+    
+    def record_success(self):
+        if self.is_open:
+            Logger.success(None, f'API at {self.host} is responding again, resuming')
+        self.failures = 0
+        self.open_until = 0.0
+        self.probing = False
+    
+    def record_failure(self):
+        self.failures += 1
+        if self.probing or (not self.is_open and self.failures >= self.threshold):
+            self.probing = False
+            self.open_until = time.monotonic() + self.cooldown
+            Logger.warning(None, f'API at {self.host} is failing ({self.failures} errors in a row), '
+                                 f'pausing all wallets for {self.cooldown:g}s')
+    
+    def record_rate_limited(self, retry_after: Optional[float] = None):
+        """A 429 is not a failure, but a rate-limited probe keeps the breaker open a while longer"""
+        if self.probing:
+            self.probing = False
+            self.open_until = time.monotonic() + (retry_after if retry_after is not None else self.cooldown)
+
+class PacingController:
+    """Adaptive delay between a wallet's operations, one AIMD loop per operation type
+
+    Every healthy response from an operation's endpoint shortens that
+    operation's delay by PACING_STEP seconds. A 429 on any endpoint, a
+    server or network error, or a response slower than PACING_SLOW_LATENCY
+    multiplies the delays by PACING_BACKOFF, at most once per second so a
+    burst of concurrent failures counts as one signal. Delays start in the
+    middle of DELAY_MIN..DELAY_MAX and stay between the operation's floor
+    and ceiling (PACING_FLOOR / PACING_CEILING, or PACING_LIMITS such as
+    'swap=2:20,repay=5:60'). PACING=fixed restores plain random_delay().
+    """
+    
+    ENDPOINT_KINDS = {'/share': 'checkin', '/swap': 'swap', '/supply': 'supply', '/withdraw': 'withdraw',
+                      '/borrow': 'borrow', '/repay': 'repay'}
+    BACKOFF_HOLDOFF = 1.0
+    _shared: Optional['PacingController'] = None
+    
+    def __init__(self):
+        self.adaptive = PerformanceConfig.PACING != 'fixed'
+        self.step = PerformanceConfig.PACING_STEP
+        self.backoff = PerformanceConfig.PACING_BACKOFF
+        self.slow_latency = PerformanceConfig.PACING_SLOW_LATENCY
+        self.limits = self.parse_limits(PerformanceConfig.PACING_LIMITS)
+        self.delays: Dict[str, float] = {}
+        self._last_backoff: Dict[str, float] = {}
+    
+    @classmethod
+    def shared(cls) -> 'PacingController':
+        """Process-wide controller instance"""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+    
+    @staticmethod
+    def parse_limits(text: str) -> Dict[str, Tuple[float, float]]:
+        limits = {}
+        for item in filter(None, (part.strip() for part in text.split(','))):
+            kind, _, bounds = item.partition('=')
+            floor, _, ceiling = bounds.partition(':')
+            limits[kind.strip()] = (float(floor), float(ceiling or floor))
+        return limits
+    
+    def bounds(self, kind: str) -> Tuple[float, float]:
+        return self.limits.get(kind, (PerformanceConfig.PACING_FLOOR, PerformanceConfig.PACING_CEILING))
+    
+    def delay(self, kind: str) -> float:
+        """Current delay for an operation type"""
+        delay = self.delays.get(kind)
+        if delay is None:
+            floor, ceiling = self.bounds(kind)
+            start = (PerformanceConfig.DELAY_MIN + PerformanceConfig.DELAY_MAX) / 2
+            delay = self.delays[kind] = min(max(start, floor), ceiling)
+        return delay
+    
+    async def wait(self, kind: str):
+        """Sleep before the next operation of this type (±25% jitter)"""
+        if not self.adaptive:
+            await random_delay()
+            return
+        delay = self.delay(kind)
+        if delay > 0:
+            delay = random.uniform(delay * 0.75, delay * 1.25)
+            await asyncio.sleep(delay)
+            Metrics.shared().observe_sleep(delay)
+    
+    def observe(self, endpoint: str, status: str, seconds: float):
+        """Feed back the outcome of one request"""
+        if not self.adaptive:
+            return
+        kind = self.ENDPOINT_KINDS.get(endpoint)
+        if status == '429':
+            # The limit applies to the whole account or host, so every operation type slows down
+            self._slow_down(set(self.delays) | ({kind} if kind else set()))
+        elif status == 'error' or status.startswith('5') or seconds > self.slow_latency:
+            if kind is not None:
+                self._slow_down([kind])
+        elif kind is not None and status.startswith('2'):
+            floor, _ = self.bounds(kind)
+            self.delays[kind] = max(floor, self.delay(kind) - self.step)
+    
+    def _slow_down(self, kinds):
+        now = time.monotonic()
+        for kind in kinds:
+            if now - self._last_backoff.get(kind, 0.0) < self.BACKOFF_HOLDOFF:
+                continue
+            self._last_backoff[kind] = now
+            _, ceiling = self.bounds(kind)
+            self.delays[kind] = min(ceiling, max(self.delay(kind), self.step) * self.backoff)
+
 class BlockStreetAPI:
     """BlockStreet API client with security features"""
     
@@ -313,18 +1630,24 @@ Chain ID: 1
 Nonce: Z9YFj5VY80yTwN3n
 Issued At: 2025-10-27T09:49:38.537Z
 Expiration Time: 2025-10-27T09:51:38.537Z"""
+    SIGN_IN_FIELDS = parse_sign_in_fields(CUSTOM_SIGN_TEXT)
+    
+    BASE_URL = os.getenv('BLOCKSTREET_API_URL', 'https://api.blockstreet.money/api')
+    AUTH_ERROR_STATUSES = (401, 403)
+    ALWAYS_RETRY_STATUSES = (429, 503)
     
-    def __init__(self, wallet_data: Dict, proxy: Optional[str] = None):
+    def __init__(self, wallet_data: Wallet, proxy: Optional[str] = None, session_cache: Optional[SessionCache] = None,
+                 pool: Optional['ConnectionPool'] = None):
         self.wallet_data = wallet_data
-        self.account = wallet_data['account']
-        self.name = wallet_data['name']
-        self.address = wallet_data['address']
+        self.name = wallet_data.name
+        self.address = wallet_data.address
+        self.proxy = proxy
+        self.session_cache = session_cache or SessionCache.shared()
         self.session_cookie = None
-        self.transaction_count = 0
-        self.last_transaction_time = 0
+        self._captcha_token: Optional[str] = None
+        self.rate_limiter = RateLimiter.shared()
         
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.headers = {
             'accept': 'application/json, text/plain, */*',
             'accept-language': 'en-US,en;q=0.9',
             'origin': 'https://blockstreet.money',
@@ -332,118 +1655,206 @@ Expiration Time: 2025-10-27T09:51:38.537Z"""
             'sec-fetch-dest': 'empty',
             'sec-fetch-mode': 'cors',
             'sec-fetch-site': 'same-site',
-        })
-        
-        if proxy:
-            self.session.proxies = {
-                'http': proxy,
-                'https': proxy
-            }
-    
-    def _check_rate_limit(self) -> bool:
-        """Check if rate limit is exceeded"""
-        current_time = time.time()
-        if current_time - self.last_transaction_time < 3600:
-            if self.transaction_count >= SecurityConfig.MAX_TRANSACTIONS_PER_HOUR:
-                Logger.security(f'Rate limit reached for {self.name}')
-                return False
-        else:
-            self.transaction_count = 0
-            self.last_transaction_time = current_time
-        
-        self.transaction_count += 1
-        return True
+        }
+        self.pool = pool or ConnectionPool.shared()
     
-    def _send_request(self, method: str, endpoint: str, **kwargs) -> Dict:
-        """Send HTTP request with security checks"""
-        url = f'https://api.blockstreet.money/api{endpoint}'
-        
-        headers = kwargs.pop('headers', {})
+    @property
+    def account(self):
+        return self.wallet_data.account
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Shared keep-alive session for this wallet's proxy route"""
+        return self.pool.session(self.proxy)
+    
+    async def close(self):
+        """Nothing to release per wallet; pooled connections stay open for reuse"""
+    
+    async def _send_request(self, method: str, endpoint: str, idempotent: bool = False,
+                            parse: Optional[Callable] = None, **kwargs) -> Any:
+        """Send HTTP request with security checks
+
+        Transient failures (network errors, 429 and 5xx) are retried with
+        jittered exponential backoff, honouring Retry-After. Non-idempotent
+        requests are only retried when the server cannot have acted on
+        them, unless the caller marks them idempotent. All wallets wait
+        while the host's circuit breaker is open. A parse function turns
+        the response data into records once, here.
+        """
+        url = f'{self.BASE_URL}{endpoint}'
+        
+        headers = {**self.headers, **kwargs.pop('headers', {})}
         headers['User-Agent'] = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         
-        if self.session_cookie:
-            headers['Cookie'] = self.session_cookie
-        
-        try:
-            response = self.session.request(method, url, headers=headers, timeout=30, **kwargs)
+        breaker = CircuitBreaker.for_url(url)
+        attempts = PerformanceConfig.REQUEST_RETRIES + 1
+        for attempt in range(attempts):
+            probe = await breaker.wait()
+            try:
+                await self.rate_limiter.for_endpoint(endpoint)
+                if self.session_cookie:
+                    headers['Cookie'] = self.session_cookie
+                result = await self._send_once(method, url, endpoint, headers, kwargs)
+                breaker.record_success()
+                return parse(result) if parse else result
+            
+            except TransientError as e:
+                if e.status == 429:
+                    breaker.record_rate_limited(e.retry_after)
+                else:
+                    breaker.record_failure()
+                retryable = idempotent or method == 'GET' or not e.sent or e.status in self.ALWAYS_RETRY_STATUSES
+                if not retryable or attempt == attempts - 1:
+                    raise TransientError(f'Request failed: {str(e)}', e.status, e.retry_after, e.sent)
+                delay = backoff_delay(attempt, e.retry_after)
+                Logger.warning(self.name, f'{endpoint} {str(e)[:80]}, retrying in {delay:.1f}s '
+                                          f'({attempt + 1}/{attempts - 1})')
+                await asyncio.sleep(delay)
+                Metrics.shared().observe_backoff(delay)
             
-            if 'set-cookie' in response.headers:
-                cookie = response.headers['set-cookie']
+            except AuthenticationError:
+                breaker.record_success()
+                raise
+            except Exception as e:
+                breaker.record_success()
+                raise Exception(f'Request failed: {str(e)}')
+            finally:
+                if probe:
+                    breaker.end_probe()
+    
+    async def _send_once(self, method: str, url: str, endpoint: str, headers: Dict, kwargs: Dict) -> Dict:
+        """One HTTP round trip; raises TransientError for retryable failures"""
+        status = 'error'
+        started = time.perf_counter()
+        try:
+            code, cookies, retry_after, body = await self._exchange(method, url, endpoint, headers, kwargs)
+            status = str(code)
+            for cookie in cookies:
                 if 'gfsessionid=' in cookie:
                     self.session_cookie = cookie.split(';')[0]
             
-            if response.status_code >= 200 and response.status_code < 300:
-                data = response.json()
-                if data.get('code') in [0, '0']:
-                    return data.get('data', data)
-                return data
+            if code >= 200 and code < 300:
+                if body.get('code') in [0, '0']:
+                    return body.get('data', body)
+                return body
             
-            raise Exception(f'HTTP {response.status_code}: {response.text}')
-        
-        except Exception as e:
-            raise Exception(f'Request failed: {str(e)}')
+            if code in self.AUTH_ERROR_STATUSES:
+                raise AuthenticationError(f'HTTP {code}: {body}')
+            if code == 429 or code >= 500:
+                raise TransientError(f'HTTP {code}: {body}', code, parse_retry_after(retry_after))
+            raise Exception(f'HTTP {code}: {body}')
+        
+        except aiohttp.ClientConnectorError as e:
+            raise TransientError(str(e), sent=False)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise TransientError(str(e) or type(e).__name__)
+        finally:
+            elapsed = time.perf_counter() - started
+            Metrics.shared().observe_request(method, endpoint, status, elapsed)
+            PacingController.shared().observe(endpoint, status, elapsed)
     
-    async def login(self, captcha_token: str) -> Dict:
-        """Login to BlockStreet"""
-        try:
-            Logger.process(self.name, 'Generating signature...')
-            
-            message = encode_defunct(text=self.CUSTOM_SIGN_TEXT)
-            signed_message = self.account.sign_message(message)
-            signature = signed_message.signature.hex()
-            
-            import re
-            nonce_match = re.search(r'Nonce:\s*([^\n\r]+)', self.CUSTOM_SIGN_TEXT)
-            nonce = nonce_match.group(1).strip() if nonce_match else 'Z9YFj5VY80yTwN3n'
-            
-            issued_match = re.search(r'Issued At:\s*([^\n\r]+)', self.CUSTOM_SIGN_TEXT)
-            issued_at = issued_match.group(1).strip() if issued_match else datetime.now().isoformat()
-            
-            expiration_match = re.search(r'Expiration Time:\s*([^\n\r]+)', self.CUSTOM_SIGN_TEXT)
-            expiration_time = expiration_match.group(1).strip() if expiration_match else datetime.now().isoformat()
-            
-            data = {
-                'address': self.address,
-                'nonce': nonce,
-                'signature': signature,
-                'chainId': '1',
-                'issuedAt': issued_at,
-                'expirationTime': expiration_time,
-                'invite_code': os.getenv('INVITE_CODE', '')
-            }
-            
-            Logger.process(self.name, 'Authenticating with server...')
-            result = self._send_request('POST', '/account/signverify', data=data)
-            
-            Logger.success(self.name, 'Authentication successful ✓')
-            return result
+    async def _exchange(self, method: str, url: str, endpoint: str, headers: Dict,
+                        kwargs: Dict) -> Tuple[int, List[str], Optional[str], Any]:
+        """The network round trip itself
+
+        Returns (status, Set-Cookie headers, Retry-After header, body); the
+        body is decoded JSON for 2xx responses and text otherwise.
+        """
+        session = self._get_session()
+        async with session.request(method, url, headers=headers, proxy=self.proxy, **kwargs) as response:
+            if response.status >= 200 and response.status < 300:
+                body = await response.json(content_type=None)
+            else:
+                body = await response.text()
+            return response.status, response.headers.getall('set-cookie', []), response.headers.get('Retry-After'), body
+    
+    async def _authed_request(self, method: str, endpoint: str, **kwargs) -> Dict:
+        """Send a request that needs a session, logging in again once if it was rejected"""
+        try:
+            return await self._send_request(method, endpoint, **kwargs)
+        except AuthenticationError:
+            if self._captcha_token is None:
+                raise
+            Logger.warning(self.name, 'Session rejected by server, logging in again')
+            self.session_cache.invalidate(self.address)
+            self.session_cookie = None
+            await self.login(self._captcha_token)
+            return await self._send_request(method, endpoint, **kwargs)
+    
+    async def ensure_session(self, captcha_token: str) -> bool:
+        """Reuse a cached session cookie; log in only if none is valid
+
+        Returns True when a fresh login was performed.
+        """
+        self._captcha_token = captcha_token
+        cookie = self.session_cache.get(self.address)
+        if cookie:
+            self.session_cookie = cookie
+            Logger.info(self.name, 'Reusing cached session')
+            return False
         
-        except Exception as e:
-            raise Exception(f'Authentication failed: {str(e)}')
+        await self.login(captcha_token)
+        return True
+    
+    async def login(self, captcha_token: str) -> Dict:
+        """Login to BlockStreet"""
+        with Profiler.shared().phase('login'):
+            try:
+                Logger.process(self.name, 'Generating signature...')
+                
+                signature = LoginSigner.sign(self.wallet_data)
+                
+                data = {
+                    'address': self.address,
+                    'nonce': self.SIGN_IN_FIELDS['nonce'],
+                    'signature': signature,
+                    'chainId': '1',
+                    'issuedAt': self.SIGN_IN_FIELDS['issuedAt'],
+                    'expirationTime': self.SIGN_IN_FIELDS['expirationTime'],
+                    'invite_code': os.getenv('INVITE_CODE', '')
+                }
+                
+                Logger.process(self.name, 'Authenticating with server...')
+                result = await self._send_request('POST', '/account/signverify', idempotent=True, data=data)
+                self._captcha_token = captcha_token
+                if self.session_cookie:
+                    self.session_cache.put(self.address, self.session_cookie)
+                
+                Logger.success(self.name, 'Authentication successful ✓')
+                return result
+            
+            except Exception as e:
+                raise Exception(f'Authentication failed: {str(e)}')
     
-    def get_token_list(self) -> List[Dict]:
+    async def get_token_list(self) -> List[Token]:
         """Get available tokens"""
-        return self._send_request('GET', '/swap/token_list')
+        with Profiler.shared().phase('fetch'):
+            return await self._authed_request('GET', '/swap/token_list', parse=Token.parse_list)
     
-    def get_earn_info(self) -> Dict:
+    async def get_earn_info(self) -> Dict:
         """Get earning information"""
-        return self._send_request('GET', '/earn/info')
+        with Profiler.shared().phase('fetch'):
+            return await self._authed_request('GET', '/earn/info')
     
-    def get_supplies(self) -> List[Dict]:
+    async def get_supplies(self) -> List[SupplyPosition]:
         """Get supplied assets"""
-        return self._send_request('GET', '/my/supply')
+        with Profiler.shared().phase('fetch'):
+            return await self._authed_request('GET', '/my/supply', parse=SupplyPosition.parse_list)
     
-    def share(self) -> Dict:
+    async def share(self) -> Dict:
         """Daily check-in"""
-        if not self._check_rate_limit():
-            raise Exception('Rate limit exceeded')
+        await self.rate_limiter.for_wallet(self.address, self.name)
         
-        return self._send_request('POST', '/share')
+        return await self._authed_request('POST', '/share')
     
-    def swap(self, from_symbol: str, to_symbol: str, from_amount: float, to_amount: float) -> Dict:
+    async def swap(self, from_symbol: str, to_symbol: str, from_amount: float, to_amount: float) -> Dict:
         """Swap tokens with security checks"""
-        if not self._check_rate_limit():
-            raise Exception('Rate limit exceeded')
+        await self.rate_limiter.for_wallet(self.address, self.name)
         
         if not WalletManager.validate_transaction_amount(from_amount):
             raise Exception('Amount exceeds security limit')
@@ -455,12 +1866,11 @@ Expiration Time: 2025-10-27T09:51:38.537Z"""
             'to_amount': str(to_amount)
         }
         
-        return self._send_request('POST', '/swap', json=data)
+        return await self._authed_request('POST', '/swap', json=data)
     
-    def supply(self, symbol: str, amount: float) -> Dict:
+    async def supply(self, symbol: str, amount: float) -> Dict:
         """Supply tokens with security checks"""
-        if not self._check_rate_limit():
-            raise Exception('Rate limit exceeded')
+        await self.rate_limiter.for_wallet(self.address, self.name)
         
         if not WalletManager.validate_transaction_amount(amount):
             raise Exception('Amount exceeds security limit')
@@ -470,12 +1880,11 @@ Expiration Time: 2025-10-27T09:51:38.537Z"""
             'amount': str(amount)
         }
         
-        return self._send_request('POST', '/supply', json=data)
+        return await self._authed_request('POST', '/supply', json=data)
     
-    def withdraw(self, symbol: str, amount: float) -> Dict:
+    async def withdraw(self, symbol: str, amount: float) -> Dict:
         """Withdraw tokens with security checks"""
-        if not self._check_rate_limit():
-            raise Exception('Rate limit exceeded')
+        await self.rate_limiter.for_wallet(self.address, self.name)
         
         if not WalletManager.validate_transaction_amount(amount):
             raise Exception('Amount exceeds security limit')
@@ -485,12 +1894,11 @@ Expiration Time: 2025-10-27T09:51:38.537Z"""
             'amount': str(amount)
         }
         
-        return self._send_request('POST', '/withdraw', json=data)
+        return await self._authed_request('POST', '/withdraw', json=data)
     
-    def borrow(self, symbol: str, amount: float) -> Dict:
+    async def borrow(self, symbol: str, amount: float) -> Dict:
         """Borrow tokens with security checks"""
-        if not self._check_rate_limit():
-            raise Exception('Rate limit exceeded')
+        await self.rate_limiter.for_wallet(self.address, self.name)
         
         if not WalletManager.validate_transaction_amount(amount):
             raise Exception('Amount exceeds security limit')
@@ -500,12 +1908,11 @@ Expiration Time: 2025-10-27T09:51:38.537Z"""
             'amount': str(amount)
         }
         
-        return self._send_request('POST', '/borrow', json=data)
+        return await self._authed_request('POST', '/borrow', json=data)
     
-    def repay(self, symbol: str, amount: float) -> Dict:
+    async def repay(self, symbol: str, amount: float) -> Dict:
         """Repay borrowed tokens with security checks"""
-        if not self._check_rate_limit():
-            raise Exception('Rate limit exceeded')
+        await self.rate_limiter.for_wallet(self.address, self.name)
         
         if not WalletManager.validate_transaction_amount(amount):
             raise Exception('Amount exceeds security limit')
@@ -515,414 +1922,1297 @@ Expiration Time: 2025-10-27T09:51:38.537Z"""
             'amount': str(amount)
         }
         
-        return self._send_request('POST', '/repay', json=data)
+        return await self._authed_request('POST', '/repay', json=data)
 
-async def process_auto_swap(wallets: List[Dict], proxies: List[str], token_list: List[Dict], captcha_token: str, tx_count: int):
-    """Process auto swap for all wallets"""
-    Logger.info(None, f'Starting Auto Swap for {len(wallets)} wallet(s)')
-    Logger.info(None, f'Transactions per wallet: {tx_count}')
+SIMULATED_TOKENS = [
+    {'symbol': 'USDT', 'price': '1'},
+    {'symbol': 'USDC', 'price': '1'},
+    {'symbol': 'ETH', 'price': '3450.25'},
+    {'symbol': 'BTC', 'price': '67250.10'},
+    {'symbol': 'COIN', 'price': '0.7521'},
+    {'symbol': 'TSLA', 'price': '1.0003'},
+    {'symbol': 'AAPL', 'price': '0.9412'},
+    {'symbol': 'NVDA', 'price': '1.2240'},
+    {'symbol': 'AMZN', 'price': '0.8675'},
+    {'symbol': 'MSFT', 'price': '1.1123'},
+]
+
+SimulatedResponse = Tuple[int, Dict, Dict[str, str]]
+
+class SimulatedBackend:
+    """In-process model of the BlockStreet endpoints the bot uses
+
+    Serves SimulatedAPI (--simulate) and the local mock server. Every
+    address gets a starting portfolio seeded from the address itself, so
+    results do not depend on the order wallets run in, and forget() drops
+    it again so memory follows the wallets in flight, not the run size.
+    """
     
-    proxy_index = 0
-    for idx, wallet_data in enumerate(wallets, 1):
-        proxy = proxies[proxy_index % len(proxies)] if proxies else None
-        proxy_index += 1
-        
-        print(f"\n{Colors.CYAN}{'═' * 60}{Colors.RESET}")
-        print(f"{Colors.YELLOW}Processing Wallet {idx}/{len(wallets)}: {wallet_data['name']}{Colors.RESET}")
-        print(f"{Colors.CYAN}{'═' * 60}{Colors.RESET}")
-        
-        api = BlockStreetAPI(wallet_data, proxy)
-        
+    STARTING_SUPPLY = 0.05
+    STARTING_ASSETS = 3
+    SESSION_PREFIX = 'sim-'
+    
+    def __init__(self, latency: float = 0.05, jitter: float = 0.02, error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0, retry_after: float = 1.0, seed: Optional[int] = None,
+                 tokens: Optional[List[Dict]] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.seed = seed
+        self.tokens = tokens or SIMULATED_TOKENS
+        self.rng = random.Random(seed)
+        self.supplies: Dict[str, Dict[str, float]] = {}
+        self.borrows: Dict[str, Dict[str, float]] = {}
+        self.request_count = 0
+        self.routes = {
+            ('POST', '/account/signverify'): self.signverify,
+            ('GET', '/swap/token_list'): self.token_list,
+            ('GET', '/earn/info'): self.earn_info,
+            ('GET', '/my/supply'): self.my_supply,
+            ('POST', '/share'): self.share,
+            ('POST', '/swap'): self.swap,
+            ('POST', '/supply'): functools.partial(self._position_change, self.supplies, 1),
+            ('POST', '/withdraw'): functools.partial(self._position_change, self.supplies, -1),
+            ('POST', '/borrow'): functools.partial(self._position_change, self.borrows, 1),
+            ('POST', '/repay'): functools.partial(self._position_change, self.borrows, -1),
+        }
+    
+    @classmethod
+    def from_config(cls, seed_offset: int = 0) -> 'SimulatedBackend':
+        """Backend with the SIM_* settings from PerformanceConfig"""
+        return cls(PerformanceConfig.SIM_LATENCY, PerformanceConfig.SIM_JITTER, PerformanceConfig.SIM_ERROR_RATE,
+                   PerformanceConfig.SIM_RATE_LIMIT_RATE, seed=PerformanceConfig.SIM_SEED + seed_offset)
+    
+    def delay(self) -> float:
+        """Latency of the next response"""
+        if self.jitter:
+            return max(0.0, self.rng.gauss(self.latency, self.jitter))
+        return self.latency
+    
+    def chaos(self) -> Optional[SimulatedResponse]:
+        """An injected 429 or 500 for the next request, or None to serve it normally"""
+        self.request_count += 1
+        roll = self.rng.random()
+        if roll < self.rate_limit_rate:
+            return 429, {'code': 429, 'message': 'Too Many Requests'}, {'Retry-After': str(self.retry_after)}
+        if roll < self.rate_limit_rate + self.error_rate:
+            return 500, {'code': 500, 'message': 'Internal Server Error'}, {}
+        return None
+    
+    def handle(self, method: str, endpoint: str, payload: Dict, cookie: str) -> SimulatedResponse:
+        """Answer one request; endpoint is the path below /api"""
+        route = self.routes.get((method, endpoint))
+        if route is None:
+            return self._fail('not found', 404)
+        address = self._address(cookie)
+        if address is None and route != self.signverify:
+            return self._fail('not logged in', 401)
         try:
-            await api.login(captcha_token)
-            
-            supplies = api.get_supplies()
-            owned_tokens = [s for s in supplies if s and float(s.get('amount', 0)) > 0]
-            
-            if not owned_tokens:
-                Logger.warning(wallet_data['name'], 'No supplied assets found to swap')
-                continue
-            
-            for i in range(tx_count):
-                Logger.process(wallet_data['name'], f'Executing swap {i + 1}/{tx_count}')
-                
-                try:
-                    from_asset = random.choice(owned_tokens)
-                    from_token = next((t for t in token_list if t['symbol'] == from_asset['symbol']), None)
-                    
-                    if not from_token:
-                        continue
-                    
-                    to_token = random.choice([t for t in token_list if t['symbol'] != from_token['symbol']])
-                    
-                    from_amount = get_random_amount(0.001, 0.0015)
-                    to_amount = (from_amount * float(from_token.get('price', 1))) / float(to_token.get('price', 1))
-                    
-                    api.swap(from_token['symbol'], to_token['symbol'], from_amount, to_amount)
-                    Logger.success(wallet_data['name'], f'Swapped {from_amount:.6f} {from_token["symbol"]} → {to_amount:.6f} {to_token["symbol"]}')
-                    
-                except Exception as e:
-                    Logger.error(wallet_data['name'], f'Swap failed: {str(e)}')
-                
-                if i < tx_count - 1:
-                    await random_delay()
-        
-        except Exception as e:
-            Logger.error(wallet_data['name'], f'Error: {str(e)}')
-        
-        await asyncio.sleep(3)
+            return route(address, payload)
+        except (KeyError, ValueError) as e:
+            return self._fail(f'invalid request: {str(e)}')
+    
+    def forget(self, address: str):
+        """Drop the state kept for an address"""
+        self.supplies.pop(address.lower(), None)
+        self.borrows.pop(address.lower(), None)
+    
+    @staticmethod
+    def _ok(data) -> SimulatedResponse:
+        return 200, {'code': 0, 'message': 'success', 'data': data}, {}
+    
+    @staticmethod
+    def _fail(message: str, status: int = 400) -> SimulatedResponse:
+        return status, {'code': status, 'message': message}, {}
+    
+    def _address(self, cookie: str) -> Optional[str]:
+        for part in cookie.split(';'):
+            name, _, value = part.strip().partition('=')
+            if name == 'gfsessionid' and value.startswith(self.SESSION_PREFIX):
+                return value[len(self.SESSION_PREFIX):]
+        return None
+    
+    def _supplies(self, address: str) -> Dict[str, float]:
+        if address not in self.supplies:
+            rng = random.Random(f'{self.seed}:{address}')
+            symbols = rng.sample([t['symbol'] for t in self.tokens], self.STARTING_ASSETS)
+            self.supplies[address] = {symbol: self.STARTING_SUPPLY for symbol in symbols}
+            self.borrows[address] = {}
+        return self.supplies[address]
+    
+    def signverify(self, _, payload: Dict) -> SimulatedResponse:
+        address = str(payload.get('address', '')).lower()
+        if not address or not payload.get('signature'):
+            return self._fail('invalid signature')
+        self._supplies(address)
+        status, body, headers = self._ok({'address': address})
+        headers['Set-Cookie'] = f'gfsessionid={self.SESSION_PREFIX}{address}; Path=/; HttpOnly'
+        return status, body, headers
+    
+    def token_list(self, address: str, payload: Dict) -> SimulatedResponse:
+        return self._ok(self.tokens)
+    
+    def earn_info(self, address: str, payload: Dict) -> SimulatedResponse:
+        return self._ok({'balance': str(sum(self._supplies(address).values()))})
+    
+    def my_supply(self, address: str, payload: Dict) -> SimulatedResponse:
+        return self._ok([{'symbol': symbol, 'amount': str(amount)}
+                         for symbol, amount in self._supplies(address).items()])
+    
+    def share(self, address: str, payload: Dict) -> SimulatedResponse:
+        return self._ok({'points': 10})
+    
+    def swap(self, address: str, payload: Dict) -> SimulatedResponse:
+        from_symbol, to_symbol = payload['from_symbol'], payload['to_symbol']
+        from_amount, to_amount = float(payload['from_amount']), float(payload['to_amount'])
+        
+        balances = self._supplies(address)
+        if balances.get(from_symbol, 0.0) < from_amount:
+            return self._fail('insufficient balance')
+        balances[from_symbol] -= from_amount
+        balances[to_symbol] = balances.get(to_symbol, 0.0) + to_amount
+        return self._ok({'from_symbol': from_symbol, 'to_symbol': to_symbol,
+                         'from_amount': str(from_amount), 'to_amount': str(to_amount)})
+    
+    def _position_change(self, book: Dict[str, Dict[str, float]], sign: int, address: str,
+                         payload: Dict) -> SimulatedResponse:
+        symbol, amount = payload['symbol'], float(payload['amount'])
+        
+        self._supplies(address)
+        positions = book[address]
+        if sign < 0 and positions.get(symbol, 0.0) < amount:
+            return self._fail('insufficient balance')
+        positions[symbol] = positions.get(symbol, 0.0) + sign * amount
+        return self._ok({'symbol': symbol, 'amount': str(amount)})
 
-async def process_manual_swap(wallets: List[Dict], proxies: List[str], token_list: List[Dict], captcha_token: str, tx_count: int):
-    """Process manual swap for all wallets"""
-    print(f"\n{Colors.CYAN}{'═' * 60}{Colors.RESET}")
-    print(f"{Colors.YELLOW}SELECT TOKEN TO SWAP FROM:{Colors.RESET}")
-    print(f"{Colors.CYAN}{'─' * 60}{Colors.RESET}")
+class SimulatedAPI(BlockStreetAPI):
+    """BlockStreetAPI answered in-process by a SimulatedBackend (--simulate)
+
+    Only the network round trip is replaced. Retries, the circuit breaker,
+    rate limits, sessions, JSON decoding and metrics run exactly as they
+    do against the live API.
+    """
     
-    for idx, token in enumerate(token_list[:20], 1):
-        print(f"{Colors.GREEN}[{idx}]{Colors.RESET} {token['symbol']}")
+    backend: Optional[SimulatedBackend] = None
     
-    try:
-        from_idx = int(input(f"\n{Colors.CYAN}>{Colors.RESET} Select FROM token (1-20): ")) - 1
-        from_token = token_list[from_idx]
-    except:
-        Logger.error(None, 'Invalid selection')
-        return
+    @classmethod
+    def shared_backend(cls) -> SimulatedBackend:
+        if cls.backend is None:
+            cls.backend = SimulatedBackend.from_config()
+        return cls.backend
     
-    print(f"\n{Colors.CYAN}{'═' * 60}{Colors.RESET}")
-    print(f"{Colors.YELLOW}SELECT TOKEN TO SWAP TO:{Colors.RESET}")
-    print(f"{Colors.CYAN}{'─' * 60}{Colors.RESET}")
+    async def close(self):
+        """Release the wallet's simulated state"""
+        self.shared_backend().forget(self.address)
     
-    for idx, token in enumerate(token_list[:20], 1):
-        if token['symbol'] != from_token['symbol']:
-            print(f"{Colors.GREEN}[{idx}]{Colors.RESET} {token['symbol']}")
+    async def _exchange(self, method: str, url: str, endpoint: str, headers: Dict,
+                        kwargs: Dict) -> Tuple[int, List[str], Optional[str], Any]:
+        backend = self.shared_backend()
+        await asyncio.sleep(backend.delay())
+        payload = kwargs.get('json') or kwargs.get('data') or {}
+        status, body, response_headers = (backend.chaos()
+                                          or backend.handle(method, endpoint, payload, headers.get('Cookie', '')))
+        text = json.dumps(body)
+        cookies = [response_headers['Set-Cookie']] if 'Set-Cookie' in response_headers else []
+        if status >= 200 and status < 300:
+            return status, cookies, None, json.loads(text)
+        return status, cookies, response_headers.get('Retry-After'), text
+
+def default_api_class() -> type:
+    """API client for this run: the simulated backend under --simulate, the live API otherwise"""
+    return SimulatedAPI if PerformanceConfig.SIMULATE else BlockStreetAPI
+
+def _sign_login_message(private_key: bytes) -> str:
+    """Sign the login message; module level so it can run in a worker process"""
+    message = encode_defunct(text=BlockStreetAPI.CUSTOM_SIGN_TEXT)
+    return Account.sign_message(message, private_key).signature.hex()
+
+def _prepare_logins(private_keys: List[bytes]) -> List[Tuple[str, str]]:
+    """(address, signature) for each key; runs in a worker process"""
+    message = encode_defunct(text=BlockStreetAPI.CUSTOM_SIGN_TEXT)
+    results = []
+    for private_key in private_keys:
+        account = Account.from_key(private_key)
+        results.append((account.address, account.sign_message(message).signature.hex()))
+    return results
+
+class LoginSigner:
+    """Memoized login signatures, batch-signed across processes in the background
+
+    precompute() derives addresses and signs in worker processes chunk by
+    chunk, in wallet order, while the run is already going; a wallet that
+    logs in before its chunk is ready is signed inline.
+    """
     
-    try:
-        to_idx = int(input(f"\n{Colors.CYAN}>{Colors.RESET} Select TO token (1-20): ")) - 1
-        to_token = token_list[to_idx]
-    except:
-        Logger.error(None, 'Invalid selection')
-        return
+    PARALLEL_THRESHOLD = 32
+    CHUNK_SIZE = 256
+    _signatures: Dict[str, str] = {}
     
-    try:
-        from_amount = float(input(f"\n{Colors.CYAN}>{Colors.RESET} Amount of {from_token['symbol']} to swap: "))
-    except:
-        Logger.error(None, 'Invalid amount')
-        return
+    @classmethod
+    def sign(cls, wallet_data: Wallet) -> str:
+        """Return the login signature for a wallet, signing it at most once"""
+        address = wallet_data.address
+        signature = cls._signatures.get(address)
+        if signature is None:
+            signature = _sign_login_message(wallet_data.private_key)
+            cls._signatures[address] = signature
+        return signature
     
-    Logger.info(None, f'Starting Manual Swap: {from_amount} {from_token["symbol"]} → {to_token["symbol"]}')
+    @classmethod
+    def _pending(cls, wallets: List[Wallet], session_cache: SessionCache) -> List[Wallet]:
+        # A wallet without a known address still needs deriving, so it is always pending
+        return [w for w in wallets
+                if not w.has_address or (w.address not in cls._signatures and not session_cache.get(w.address))]
     
-    proxy_index = 0
-    for idx, wallet_data in enumerate(wallets, 1):
-        proxy = proxies[proxy_index % len(proxies)] if proxies else None
-        proxy_index += 1
-        
-        api = BlockStreetAPI(wallet_data, proxy)
-        
+    @classmethod
+    def _store(cls, wallets: List[Wallet], results: List[Tuple[str, str]]):
+        for wallet_data, (address, signature) in zip(wallets, results):
+            if not wallet_data.has_address:
+                wallet_data.set_address(address)
+            cls._signatures[address] = signature
+    
+    @classmethod
+    def precompute(cls, wallets: List[Wallet], session_cache: Optional[SessionCache] = None) -> Optional[asyncio.Task]:
+        """Prepare logins for every wallet that will need one
+
+        Small batches are signed inline. Larger ones are handed to a
+        background task (returned) so the first wallets can start at once.
+        """
+        pending = cls._pending(wallets, session_cache or SessionCache.shared())
+        if not pending:
+            return None
+        if len(pending) < cls.PARALLEL_THRESHOLD:
+            cls._store(pending, _prepare_logins([w.private_key for w in pending]))
+            Logger.info(None, f'Precomputed {len(pending)} login signature(s)')
+            return None
+        workers = PerformanceConfig.SIGNING_WORKERS or os.cpu_count() or 1
+        if workers < 2:
+            # A single core gains nothing from a pool; each wallet signs when it logs in
+            return None
+        return asyncio.create_task(cls._precompute_parallel(pending, workers))
+    
+    @classmethod
+    async def _precompute_parallel(cls, pending: List[Wallet], workers: int):
+        loop = asyncio.get_running_loop()
+        # spawn, not fork: the process already runs the log writer thread
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        chunks = [pending[i:i + cls.CHUNK_SIZE] for i in range(0, len(pending), cls.CHUNK_SIZE)]
+        in_flight: List[Tuple[List[Wallet], asyncio.Future]] = []
+        signed = 0
         try:
-            await api.login(captcha_token)
-            
-            for i in range(tx_count):
-                Logger.process(wallet_data['name'], f'Executing swap {i + 1}/{tx_count}')
-                
+            for chunk in chunks + [None] * (workers * 2):
+                if chunk is not None:
+                    # Skip wallets the run already reached and signed inline
+                    chunk = [w for w in chunk if not w.has_address or w.address not in cls._signatures]
+                    if chunk:
+                        future = loop.run_in_executor(pool, _prepare_logins, [w.private_key for w in chunk])
+                        in_flight.append((chunk, future))
+                if len(in_flight) >= workers * 2 or (chunk is None and in_flight):
+                    done_chunk, future = in_flight.pop(0)
+                    cls._store(done_chunk, await future)
+                    signed += len(done_chunk)
+            Logger.info(None, f'Precomputed {signed} login signature(s) in the background')
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+            AddressCache.shared().flush()
+
+class ExecutionStats:
+    """Aggregated counters for a multi-wallet run"""
+    
+    def __init__(self):
+        self.wallets_done = 0
+        self.wallets_failed = 0
+        self.total_wallets = 0
+        self.ops_ok = 0
+        self.ops_failed = 0
+        self.ops_resumed = 0
+        self.ops_skipped = 0
+        self.by_operation: Dict[str, List[int]] = {}
+        self.started_at = time.perf_counter()
+        self.finished_at: Optional[float] = None
+        self.cpu_started = time.process_time()
+        self.cpu_finished: Optional[float] = None
+        self.cpu_absorbed = 0.0
+    
+    def record(self, success: bool, operation: Optional[str] = None):
+        """Record the outcome of a single operation"""
+        if success:
+            self.ops_ok += 1
+        else:
+            self.ops_failed += 1
+        if operation:
+            counts = self.by_operation.setdefault(operation, [0, 0, 0])
+            counts[0 if success else 1] += 1
+    
+    def record_skipped(self, operation: str):
+        """Record an operation dropped by the pre-flight check"""
+        self.ops_skipped += 1
+        self.by_operation.setdefault(operation, [0, 0, 0])[2] += 1
+    
+    def absorb(self, summary: Dict):
+        """Add the counters of another run's to_dict() summary"""
+        self.wallets_done += summary['wallets_ok']
+        self.wallets_failed += summary['wallets_failed']
+        self.ops_ok += summary['ops_ok']
+        self.ops_failed += summary['ops_failed']
+        self.ops_resumed += summary.get('ops_resumed', 0)
+        self.ops_skipped += summary.get('ops_skipped', 0)
+        self.cpu_absorbed += summary.get('cpu_s', 0.0)
+        for operation, counts in summary['by_operation'].items():
+            totals = self.by_operation.setdefault(operation, [0, 0, 0])
+            totals[0] += counts['ok']
+            totals[1] += counts['failed']
+            totals[2] += counts.get('skipped', 0)
+    
+    @property
+    def elapsed(self) -> float:
+        end = self.finished_at if self.finished_at is not None else time.perf_counter()
+        return end - self.started_at
+    
+    @property
+    def ops_per_second(self) -> float:
+        total = self.ops_ok + self.ops_failed
+        return total / self.elapsed if self.elapsed > 0 else 0.0
+    
+    @property
+    def cpu_seconds(self) -> float:
+        """CPU time of this process during the run, plus that of absorbed shard runs"""
+        end = self.cpu_finished if self.cpu_finished is not None else time.process_time()
+        return end - self.cpu_started + self.cpu_absorbed
+    
+    def finish(self):
+        self.finished_at = time.perf_counter()
+        self.cpu_finished = time.process_time()
+    
+    def to_dict(self) -> Dict:
+        """Machine-readable summary"""
+        total = self.ops_ok + self.ops_failed
+        return {
+            'wallets_ok': self.wallets_done,
+            'wallets_failed': self.wallets_failed,
+            'ops_ok': self.ops_ok,
+            'ops_failed': self.ops_failed,
+            'ops_resumed': self.ops_resumed,
+            'ops_skipped': self.ops_skipped,
+            'by_operation': {op: {'ok': ok, 'failed': failed, 'skipped': skipped}
+                             for op, (ok, failed, skipped) in self.by_operation.items()},
+            'wall_time_s': round(self.elapsed, 3),
+            'ops_per_sec': round(self.ops_per_second, 3),
+            'cpu_s': round(self.cpu_seconds, 3),
+            'cpu_ms_per_op': round(self.cpu_seconds * 1000 / total, 3) if total else 0.0,
+        }
+    
+    def report(self, label: str):
+        """Log a throughput summary"""
+        Logger.info(None, f'{label} finished in {self.elapsed:.1f}s - '
+                          f'wallets: {self.wallets_done} ok / {self.wallets_failed} failed, '
+                          f'ops: {self.ops_ok} ok / {self.ops_failed} failed '
+                          f'({self.ops_per_second:.2f} ops/s)')
+        if self.ops_resumed:
+            Logger.info(None, f'  Skipped {self.ops_resumed} operation(s) already completed before a restart')
+        if self.ops_skipped:
+            Logger.info(None, f'  Dropped {self.ops_skipped} infeasible operation(s) before sending')
+        for operation, (ok, failed, skipped) in self.by_operation.items():
+            Logger.info(None, f'  {operation}: {ok} ok / {failed} failed' + (f' / {skipped} skipped' if skipped else ''))
+
+class WalletExecutor:
+    """Runs one coroutine per wallet with bounded concurrency"""
+    
+    def __init__(self, concurrency: Optional[int] = None):
+        self.concurrency = max(1, concurrency or PerformanceConfig.MAX_CONCURRENT_WALLETS)
+        self.stats: Optional[ExecutionStats] = None
+    
+    async def run(self, wallets: List[Wallet], proxies: List[str], worker, label: str = 'Run') -> ExecutionStats:
+        """Run worker(idx, wallet_data, proxy, stats) for every wallet
+
+        Wallets are pulled from a shared iterator by a fixed pool of
+        consumers, so at most `concurrency` wallets are in flight and each
+        wallet's own operations still run in order inside its worker.
+        """
+        stats = self.stats = ExecutionStats()
+        stats.total_wallets = len(wallets)
+        jobs = iter(enumerate(wallets, 1))
+        
+        async def consume():
+            for idx, wallet_data in jobs:
+                proxy = proxies[(idx - 1) % len(proxies)] if proxies else None
                 try:
-                    to_amount = (from_amount * float(from_token.get('price', 1))) / float(to_token.get('price', 1))
-                    api.swap(from_token['symbol'], to_token['symbol'], from_amount, to_amount)
-                    Logger.success(wallet_data['name'], f'Swapped {from_amount:.6f} {from_token["symbol"]} → {to_amount:.6f} {to_token["symbol"]}')
+                    await worker(idx, wallet_data, proxy, stats)
+                    stats.wallets_done += 1
                 except Exception as e:
-                    Logger.error(wallet_data['name'], f'Swap failed: {str(e)}')
-                
-                if i < tx_count - 1:
-                    await random_delay()
+                    stats.wallets_failed += 1
+                    Logger.error(wallet_data.name, f'Error: {str(e)}')
         
-        except Exception as e:
-            Logger.error(wallet_data['name'], f'Error: {str(e)}')
+        workers = min(self.concurrency, len(wallets)) or 1
+        await asyncio.gather(*(consume() for _ in range(workers)))
         
-        await asyncio.sleep(3)
+        stats.finish()
+        SessionCache.shared().flush()
+        stats.report(label)
+        return stats
 
-async def process_supply(wallets: List[Dict], proxies: List[str], token_list: List[Dict], captcha_token: str, tx_count: int):
-    """Process supply for all wallets"""
-    print(f"\n{Colors.CYAN}{'═' * 60}{Colors.RESET}")
-    print(f"{Colors.YELLOW}SELECT TOKEN TO SUPPLY:{Colors.RESET}")
-    print(f"{Colors.CYAN}{'─' * 60}{Colors.RESET}")
+def print_wallet_header(idx: int, total: int, name: str):
+    """Print the per-wallet section header"""
+    Logger.raw(f"\n{Colors.CYAN}{'═' * 60}{Colors.RESET}\n"
+               f"{Colors.YELLOW}Processing Wallet {idx}/{total}: {name}{Colors.RESET}\n"
+               f"{Colors.CYAN}{'═' * 60}{Colors.RESET}")
+
+class TokenTable:
+    """Symbol-indexed token list with a compact price array
+
+    Built once from get_token_list() so swap planning is O(1) per trade:
+    tokens are addressed by index, prices live in a flat array of doubles
+    and quotes for many trades are computed in one pass.
+    """
     
-    for idx, token in enumerate(token_list[:20], 1):
-        print(f"{Colors.GREEN}[{idx}]{Colors.RESET} {token['symbol']}")
+    def __init__(self, token_list: List[Token]):
+        self.tokens = list(token_list)
+        self.symbols = [t.symbol for t in self.tokens]
+        self.index = {symbol: idx for idx, symbol in enumerate(self.symbols)}
+        self.prices = array('d', (t.price for t in self.tokens))
     
-    try:
-        token_idx = int(input(f"\n{Colors.CYAN}>{Colors.RESET} Select token (1-20): ")) - 1
-        selected_token = token_list[token_idx]
-        amount = float(input(f"{Colors.CYAN}>{Colors.RESET} Amount to supply: "))
-    except:
-        Logger.error(None, 'Invalid input')
-        return
+    def __len__(self) -> int:
+        return len(self.symbols)
     
-    Logger.info(None, f'Starting Supply: {amount} {selected_token["symbol"]}')
+    def index_of(self, symbol: str) -> Optional[int]:
+        return self.index.get(symbol)
     
-    proxy_index = 0
-    for idx, wallet_data in enumerate(wallets, 1):
-        proxy = proxies[proxy_index % len(proxies)] if proxies else None
-        proxy_index += 1
-        
-        api = BlockStreetAPI(wallet_data, proxy)
-        
+    def quote(self, from_idx: int, to_idx: int, amount: float) -> float:
+        return amount * self.prices[from_idx] / self.prices[to_idx]
+    
+    def quote_batch(self, from_idx: List[int], to_idx: List[int], amounts: List[float]) -> array:
+        """Quote many swaps at once"""
+        prices = self.prices
+        return array('d', [amount * prices[f] / prices[t] for f, t, amount in zip(from_idx, to_idx, amounts)])
+
+class PlanError(ValueError):
+    """Raised when a trade plan violates SecurityConfig limits"""
+
+class TokenCache:
+    """Token list and prices with an on-disk snapshot and TTL-based refresh
+
+    A snapshot from a previous run is usable immediately at startup; a
+    background task refetches the list whenever it is older than the TTL,
+    so long-running loops always plan against recent prices.
+    """
+    
+    RETRY_INTERVAL = 60
+    
+    def __init__(self, filename: Optional[str] = None, ttl: Optional[int] = None):
+        self.filename = filename if filename is not None else PerformanceConfig.TOKEN_CACHE_FILE
+        self.ttl = ttl if ttl is not None else PerformanceConfig.TOKEN_CACHE_TTL
+        self.tokens: List[Token] = []
+        self.table = TokenTable([])
+        self.fetched_at = 0.0
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._load_snapshot()
+    
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+    
+    @property
+    def is_fresh(self) -> bool:
+        return bool(self.tokens) and self.age < self.ttl
+    
+    def _load_snapshot(self):
+        if not self.filename or not Path(self.filename).exists():
+            return
         try:
-            await api.login(captcha_token)
-            
-            for i in range(tx_count):
-                Logger.process(wallet_data['name'], f'Executing supply {i + 1}/{tx_count}')
-                
-                try:
-                    api.supply(selected_token['symbol'], amount)
-                    Logger.success(wallet_data['name'], f'Supplied {amount:.6f} {selected_token["symbol"]}')
-                except Exception as e:
-                    Logger.error(wallet_data['name'], f'Supply failed: {str(e)}')
-                
-                if i < tx_count - 1:
-                    await random_delay()
-        
+            with open(self.filename, 'r') as f:
+                snapshot = json.load(f)
+            self._set_tokens(Token.parse_list(snapshot['tokens']), snapshot['fetched_at'])
         except Exception as e:
-            Logger.error(wallet_data['name'], f'Error: {str(e)}')
-        
-        await asyncio.sleep(3)
+            Logger.warning(None, f'Ignoring unreadable token snapshot: {str(e)}')
+    
+    def _save_snapshot(self):
+        if not self.filename:
+            return
+        try:
+            tmp_name = f'{self.filename}.tmp'
+            with open(tmp_name, 'w') as f:
+                json.dump({'fetched_at': self.fetched_at, 'tokens': [t.to_dict() for t in self.tokens]}, f)
+            os.replace(tmp_name, self.filename)
+        except Exception as e:
+            Logger.warning(None, f'Failed to save token snapshot: {str(e)}')
+    
+    def _set_tokens(self, tokens: List[Token], fetched_at: float):
+        if tokens != self.tokens:
+            self.tokens = tokens
+            self.table = TokenTable(tokens)
+        self.fetched_at = fetched_at
+    
+    def update(self, tokens: List[Token]):
+        """Store a freshly fetched token list"""
+        self._set_tokens(tokens, time.time())
+        self._save_snapshot()
+    
+    async def refresh(self, fetch) -> bool:
+        """Refetch the token list with fetch() if it is stale; returns True if refreshed"""
+        if self.is_fresh:
+            return False
+        self.update(await fetch())
+        return True
+    
+    def start_background_refresh(self, fetch):
+        """Keep the token list fresh from a background task"""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_loop(fetch))
+    
+    async def _refresh_loop(self, fetch):
+        while True:
+            try:
+                if await self.refresh(fetch):
+                    Logger.info(None, f'Token prices refreshed ({len(self.tokens)} tokens)')
+                await asyncio.sleep(max(1.0, self.ttl - self.age))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                Logger.warning(None, f'Token refresh failed: {str(e)}')
+                await asyncio.sleep(min(self.ttl, self.RETRY_INTERVAL))
+    
+    async def stop(self):
+        """Cancel the background refresh task"""
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
 
-async def process_withdraw(wallets: List[Dict], proxies: List[str], token_list: List[Dict], captcha_token: str, tx_count: int):
-    """Process withdraw for all wallets"""
-    print(f"\n{Colors.CYAN}{'═' * 60}{Colors.RESET}")
-    print(f"{Colors.YELLOW}SELECT TOKEN TO WITHDRAW:{Colors.RESET}")
-    print(f"{Colors.CYAN}{'─' * 60}{Colors.RESET}")
+class FixedAmount:
+    """Amount policy: always use the same amount"""
     
-    for idx, token in enumerate(token_list[:20], 1):
-        print(f"{Colors.GREEN}[{idx}]{Colors.RESET} {token['symbol']}")
+    def __init__(self, amount: float):
+        self.amount = amount
     
-    try:
-        token_idx = int(input(f"\n{Colors.CYAN}>{Colors.RESET} Select token (1-20): ")) - 1
-        selected_token = token_list[token_idx]
-        amount = float(input(f"{Colors.CYAN}>{Colors.RESET} Amount to withdraw: "))
-    except:
-        Logger.error(None, 'Invalid input')
-        return
+    def sample(self, rng: random.Random, n: int) -> array:
+        return array('d', [self.amount]) * n
+    
+    def __repr__(self) -> str:
+        return f'FixedAmount({self.amount!r})'
+
+class RandomAmount:
+    """Amount policy: random amount within a range, capped at the security limit"""
     
-    Logger.info(None, f'Starting Withdrawal: {amount} {selected_token["symbol"]}')
+    def __init__(self, min_val: float, max_val: float):
+        self.min_val = min_val
+        self.max_val = max_val
     
-    proxy_index = 0
-    for idx, wallet_data in enumerate(wallets, 1):
-        proxy = proxies[proxy_index % len(proxies)] if proxies else None
-        proxy_index += 1
-        
-        api = BlockStreetAPI(wallet_data, proxy)
+    def sample(self, rng: random.Random, n: int) -> array:
+        low, high, cap = self.min_val, self.max_val, SecurityConfig.MAX_TRANSACTION_AMOUNT
+        return array('d', [min(rng.uniform(low, high), cap) for _ in range(n)])
+    
+    def __repr__(self) -> str:
+        return f'RandomAmount({self.min_val!r}, {self.max_val!r})'
+
+class TokenPolicy:
+    """Chooses the token(s) an operation acts on
+
+    plan() fills one column per token slot for n operations. Columns hold
+    TokenTable indices, or random draws in [0, 1) for deferred policies
+    whose choice depends on wallet state and is resolved at execution.
+    """
+    needs_supplies = False
+    deferred = False
+    arity = 1
+    
+    def plan(self, table: TokenTable, rng: random.Random, n: int) -> Tuple[array, Optional[array]]:
+        raise NotImplementedError
+    
+    def resolve(self, ctx: 'WalletContext', a: float, b: float, amount: float) -> Optional[Tuple[int, int]]:
+        raise NotImplementedError
+    
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}()'
+
+class FixedTokens(TokenPolicy):
+    """Token policy: always the same token (or swap pair)"""
+    
+    def __init__(self, *tokens: Token):
+        self.symbols = tuple(t.symbol for t in tokens)
+        self.arity = len(self.symbols)
+    
+    def plan(self, table: TokenTable, rng: random.Random, n: int) -> Tuple[array, Optional[array]]:
+        indices = [table.index_of(symbol) for symbol in self.symbols]
+        if None in indices:
+            raise PlanError(f'Unknown token in {self.symbols}')
+        if self.arity == 2 and indices[0] == indices[1]:
+            raise PlanError(f'Cannot swap {self.symbols[0]} into itself')
+        columns = [array('i', [idx]) * n for idx in indices]
+        return columns[0], columns[1] if self.arity == 2 else None
+    
+    def __repr__(self) -> str:
+        return f"FixedTokens({', '.join(self.symbols)})"
+
+class RandomToken(TokenPolicy):
+    """Token policy: any listed token"""
+    
+    def plan(self, table: TokenTable, rng: random.Random, n: int) -> Tuple[array, Optional[array]]:
+        if not len(table):
+            raise PlanError('Token list is empty')
+        size = len(table)
+        return array('i', [rng.randrange(size) for _ in range(n)]), None
+
+class OwnedSwapPair(TokenPolicy):
+    """Token policy: swap from a supplied asset that covers the amount into any other listed token"""
+    needs_supplies = True
+    deferred = True
+    arity = 2
+    
+    def plan(self, table: TokenTable, rng: random.Random, n: int) -> Tuple[array, Optional[array]]:
+        if len(table) < 2:
+            raise PlanError('At least two tokens are needed to swap')
+        draw = rng.random
+        return array('d', [draw() for _ in range(n)]), array('d', [draw() for _ in range(n)])
+    
+    def resolve(self, ctx: 'WalletContext', a: float, b: float, amount: float) -> Optional[Tuple[int, int]]:
+        owned = ctx.owned_indices(amount + SecurityConfig.MIN_BALANCE_THRESHOLD)
+        if not owned:
+            return None
+        from_idx = owned[int(a * len(owned))]
+        to_idx = int(b * (len(ctx.table) - 1))
+        return from_idx, to_idx + 1 if to_idx >= from_idx else to_idx
+
+class OperationSpec:
+    """Declarative description of one operation in a pipeline"""
+    
+    # kind: (name, api method, progress label, success verb, warn instead of error)
+    TYPES = {
+        'checkin': ('Check-in', 'share', 'check-in', 'Daily check-in complete', True),
+        'swap': ('Swap', 'swap', 'swap', 'Swapped', False),
+        'supply': ('Supply', 'supply', 'supply', 'Supplied', False),
+        'withdraw': ('Withdrawal', 'withdraw', 'withdrawal', 'Withdrew', False),
+        'borrow': ('Borrow', 'borrow', 'borrow', 'Borrowed', False),
+        'repay': ('Repay', 'repay', 'repay', 'Repaid', False),
+    }
+    
+    def __init__(self, kind: str, token_policy: Optional[TokenPolicy] = None, amount_policy=None, count: Optional[int] = None):
+        if kind not in self.TYPES:
+            raise ValueError(f'Unknown operation: {kind}')
+        self.kind = kind
+        self.name, self.endpoint, self.action, self.verb, self.soft_fail = self.TYPES[kind]
+        self.token_policy = token_policy
+        self.amount_policy = amount_policy
+        self.count = count
+
+class PlannedStep:
+    """Columnar plan of one OperationSpec for every wallet of a run"""
+    
+    def __init__(self, spec: OperationSpec, count: int, amounts: Optional[array],
+                 column_a: Optional[array], column_b: Optional[array], quotes: Optional[array]):
+        self.spec = spec
+        self.count = count
+        self.amounts = amounts
+        self.column_a = column_a
+        self.column_b = column_b
+        self.quotes = quotes
+    
+    def call(self, pos: int, seq: int, ctx: 'WalletContext') -> Optional[Tuple[tuple, str]]:
+        """API call arguments and log description of operation `seq` for the wallet at `pos`
+
+        Deferred token choices are resolved against the wallet's ledger as
+        it is at that moment. None marks an operation without valid tokens,
+        which is skipped.
+        """
+        policy = self.spec.token_policy
+        if policy is None:
+            return (), ''
+        
+        table = ctx.table
+        slot = pos * self.count + seq
+        amount = self.amounts[slot]
+        if policy.deferred:
+            pair = policy.resolve(ctx, self.column_a[slot], self.column_b[slot], amount)
+            if pair is None:
+                return None
+            from_idx, to_idx = pair
+            to_amount = table.quote(from_idx, to_idx, amount)
+        elif self.column_b is None:
+            symbol = table.symbols[self.column_a[slot]]
+            return (symbol, amount), f'{amount:.6f} {symbol}'
+        else:
+            from_idx, to_idx = self.column_a[slot], self.column_b[slot]
+            to_amount = self.quotes[slot]
         
+        from_symbol, to_symbol = table.symbols[from_idx], table.symbols[to_idx]
+        return (from_symbol, to_symbol, amount, to_amount), f'{amount:.6f} {from_symbol} → {to_amount:.6f} {to_symbol}'
+
+class TradePlan:
+    """Complete plan for a run: every step for every wallet"""
+    
+    def __init__(self, steps: List[PlannedStep], wallet_count: int, table: TokenTable):
+        self.steps = steps
+        self.wallet_count = wallet_count
+        self.table = table
+    
+    @property
+    def ops_per_wallet(self) -> int:
+        return sum(step.count for step in self.steps)
+
+class TradePlanner:
+    """Generates and validates the whole wallets x operations plan up front
+
+    Amounts, token choices and swap quotes are generated column by column
+    for all wallets at once, and checked against SecurityConfig before any
+    request is sent. A seed makes the plan reproducible.
+    """
+    
+    def __init__(self, specs: List[OperationSpec], table: TokenTable, tx_count: int, seed: Optional[int] = None):
+        self.specs = specs
+        self.table = table
+        self.tx_count = tx_count
+        self.rng = random.Random(seed)
+    
+    def plan(self, wallet_count: int) -> TradePlan:
+        # No cap on operations per run: the wallet rate limiter spreads them over the hours they need
+        counts = [spec.count or self.tx_count for spec in self.specs]
+        steps = []
+        for spec, count in zip(self.specs, counts):
+            n = wallet_count * count
+            amounts = spec.amount_policy.sample(self.rng, n) if spec.amount_policy else None
+            self.validate_amounts(spec, amounts)
+            column_a = column_b = quotes = None
+            if spec.token_policy:
+                column_a, column_b = spec.token_policy.plan(self.table, self.rng, n)
+                if column_b is not None and not spec.token_policy.deferred:
+                    quotes = self.table.quote_batch(column_a, column_b, amounts)
+            steps.append(PlannedStep(spec, count, amounts, column_a, column_b, quotes))
+        
+        return TradePlan(steps, wallet_count, self.table)
+    
+    @staticmethod
+    def validate_amounts(spec: OperationSpec, amounts: Optional[array]):
+        """Reject amounts that would break SecurityConfig limits"""
+        if spec.token_policy and amounts is None:
+            raise PlanError(f'{spec.name} has no amount policy')
+        if not amounts:
+            return
+        if min(amounts) <= 0:
+            raise PlanError(f'{spec.name} amount must be positive')
+        largest = max(amounts)
+        if largest > SecurityConfig.MAX_TRANSACTION_AMOUNT:
+            raise PlanError(f'{spec.name} amount {largest} exceeds limit {SecurityConfig.MAX_TRANSACTION_AMOUNT}')
+
+class BalanceLedger:
+    """Local copy of one wallet's supplied balances, kept in step with its operations
+
+    Seeded from /my/supply and then moved by the result of every swap,
+    supply, withdraw, borrow and repay instead of being refetched. A
+    failed balance-changing operation means the server disagrees with the
+    ledger (or may have acted without answering), so the ledger goes stale
+    and is reseeded before the next choice that depends on it.
+
+    The API does not report loans, so `borrows` only holds loans taken
+    since the last reseed; a loan missing from it is unknown, not zero.
+    """
+    
+    def __init__(self):
+        self.supplies: Dict[str, float] = {}
+        self.borrows: Dict[str, float] = {}
+        self.stale = True
+    
+    def seed(self, supplies: List[SupplyPosition]):
+        self.supplies = {s.symbol: s.amount for s in supplies}
+        # Loans the ledger tracked may have changed while it was stale
+        self.borrows = {}
+        self.stale = False
+    
+    def invalidate(self):
+        self.stale = True
+    
+    def balance(self, symbol: str) -> float:
+        return self.supplies.get(symbol, 0.0)
+    
+    def owned(self, minimum: float = 0.0) -> List[str]:
+        """Symbols with a supplied balance above zero that covers `minimum`"""
+        return [symbol for symbol, amount in self.supplies.items() if amount > 0 and amount >= minimum]
+    
+    def apply(self, kind: str, args: tuple, result):
+        """Move balances by a successful operation, preferring the amounts the server reports"""
+        if self.stale:
+            return
+        result = result if isinstance(result, dict) else {}
+        if kind == 'swap':
+            from_symbol, to_symbol, from_amount, to_amount = args
+            self._move(self.supplies, from_symbol, -float(result.get('from_amount', from_amount)))
+            self._move(self.supplies, to_symbol, float(result.get('to_amount', to_amount)))
+        elif kind in ('supply', 'withdraw'):
+            symbol, amount = args
+            self._move(self.supplies, symbol, float(result.get('amount', amount)) * (1 if kind == 'supply' else -1))
+        elif kind == 'borrow' or (kind == 'repay' and args[0] in self.borrows):
+            symbol, amount = args
+            self._move(self.borrows, symbol, float(result.get('amount', amount)) * (1 if kind == 'borrow' else -1))
+    
+    def check(self, kind: str, args: tuple) -> Optional[str]:
+        """Why an operation cannot succeed against these balances, or None if it can
+
+        Supplied balances must stay at or above MIN_BALANCE_THRESHOLD after
+        a swap or withdrawal, borrowing needs supplied collateral, and a
+        repay may not exceed a loan the ledger knows about. Repays of loans
+        it does not know, and supplies (which draw on wallet funds the API
+        does not report), are never rejected here.
+        """
+        threshold = SecurityConfig.MIN_BALANCE_THRESHOLD
+        if kind in ('swap', 'withdraw'):
+            symbol, amount = args[0], args[2 if kind == 'swap' else 1]
+            balance = self.balance(symbol)
+            if balance - amount < threshold:
+                return f'{symbol} supplied balance {balance:.6f} cannot cover {amount:.6f} and keep {threshold}'
+        elif kind == 'borrow':
+            if sum(self.supplies.values()) < threshold:
+                return 'no supplied collateral'
+        elif kind == 'repay':
+            symbol, amount = args
+            if symbol in self.borrows and self.borrows[symbol] < amount:
+                return f'{symbol} loan {self.borrows[symbol]:.6f} is smaller than {amount:.6f}'
+        return None
+    
+    def _move(self, book: Dict[str, float], symbol: str, delta: float):
+        balance = book.get(symbol, 0.0) + delta
+        if balance < 0:
+            # The server accepted more than the ledger knew about
+            self.stale = True
+        book[symbol] = balance
+
+class WalletContext:
+    """Per-wallet state shared by the operations of one pipeline run"""
+    
+    BALANCE_KINDS = ('swap', 'supply', 'withdraw', 'borrow', 'repay')
+    CHECKED_KINDS = ('swap', 'withdraw', 'borrow', 'repay')
+    
+    def __init__(self, wallet_data: Wallet, api: BlockStreetAPI, table: TokenTable):
+        self.wallet_data = wallet_data
+        self.name = wallet_data.name
+        self.address = wallet_data.address
+        self.api = api
+        self.table = table
+        self.ledger = BalanceLedger()
+    
+    async def sync_ledger(self) -> BalanceLedger:
+        """Reseed the ledger from /my/supply if it is not trusted"""
+        if self.ledger.stale:
+            self.ledger.seed(await self.api.get_supplies())
+        return self.ledger
+    
+    async def preflight(self, kind: str, args: tuple) -> Optional[str]:
+        """Check an operation against the ledger; returns why it is infeasible, or None"""
+        if kind not in self.CHECKED_KINDS:
+            return None
         try:
-            await api.login(captcha_token)
-            
-            for i in range(tx_count):
-                Logger.process(wallet_data['name'], f'Executing withdrawal {i + 1}/{tx_count}')
-                
-                try:
-                    api.withdraw(selected_token['symbol'], amount)
-                    Logger.success(wallet_data['name'], f'Withdrew {amount:.6f} {selected_token["symbol"]}')
-                except Exception as e:
-                    Logger.error(wallet_data['name'], f'Withdrawal failed: {str(e)}')
-                
-                if i < tx_count - 1:
-                    await random_delay()
-        
+            ledger = await self.sync_ledger()
         except Exception as e:
-            Logger.error(wallet_data['name'], f'Error: {str(e)}')
-        
-        await asyncio.sleep(3)
-
-async def process_borrow(wallets: List[Dict], proxies: List[str], token_list: List[Dict], captcha_token: str, tx_count: int):
-    """Process borrow for all wallets"""
-    print(f"\n{Colors.CYAN}{'═' * 60}{Colors.RESET}")
-    print(f"{Colors.YELLOW}SELECT TOKEN TO BORROW:{Colors.RESET}")
-    print(f"{Colors.CYAN}{'─' * 60}{Colors.RESET}")
+            Logger.warning(self.name, f'Balances unavailable, sending {kind} unchecked: {str(e)}')
+            return None
+        return ledger.check(kind, args)
     
-    for idx, token in enumerate(token_list[:20], 1):
-        print(f"{Colors.GREEN}[{idx}]{Colors.RESET} {token['symbol']}")
+    def record(self, kind: str, args: tuple, success: bool, result=None):
+        """Keep the ledger in step with an operation's outcome"""
+        if kind not in self.BALANCE_KINDS:
+            return
+        if success:
+            self.ledger.apply(kind, args, result)
+        else:
+            self.ledger.invalidate()
     
-    try:
-        token_idx = int(input(f"\n{Colors.CYAN}>{Colors.RESET} Select token (1-20): ")) - 1
-        selected_token = token_list[token_idx]
-        amount = float(input(f"{Colors.CYAN}>{Colors.RESET} Amount to borrow: "))
-    except:
-        Logger.error(None, 'Invalid input')
-        return
+    def owned_indices(self, minimum: float = 0.0) -> List[int]:
+        """TokenTable indices of the listed tokens whose supplied balance covers `minimum`"""
+        indices = (self.table.index_of(symbol) for symbol in self.ledger.owned(minimum))
+        return [idx for idx in indices if idx is not None]
+
+class OperationPipeline:
+    """Runs a sequence of OperationSpecs for every wallet
+
+    Login, pacing, retries, pre-flight balance checks and outcome accounting
+    live here once, so every operation type gets the same execution path.
+    The whole run is planned before the first request and the executor only
+    streams the plan.
+    """
     
-    Logger.info(None, f'Starting Borrow: {amount} {selected_token["symbol"]}')
+    def __init__(self, specs: List[OperationSpec], token_list: List[Token], captcha_token: str, tx_count: int,
+                 executor: Optional[WalletExecutor] = None, seed: Optional[int] = None,
+                 token_cache: Optional[TokenCache] = None, api_class: Optional[type] = None,
+                 journal: Optional[RunJournal] = None, resume_window: Optional[float] = None):
+        self.specs = specs
+        self.journal = journal if journal is not None else RunJournal.shared()
+        self.resume_window = resume_window
+        self.api_class = api_class or default_api_class()
+        self.token_cache = token_cache
+        self.table = token_cache.table if token_cache else TokenTable(token_list)
+        self.captcha_token = captcha_token
+        self.tx_count = tx_count
+        self.executor = executor or WalletExecutor()
+        self.planner = TradePlanner(specs, self.table, tx_count, PerformanceConfig.PLAN_SEED if seed is None else seed)
     
-    proxy_index = 0
-    for idx, wallet_data in enumerate(wallets, 1):
-        proxy = proxies[proxy_index % len(proxies)] if proxies else None
-        proxy_index += 1
-        
-        api = BlockStreetAPI(wallet_data, proxy)
-        
+    async def run(self, wallets: List[Wallet], proxies: List[str], label: str) -> ExecutionStats:
+        """Plan, then execute; raises PlanError before any request if the plan is invalid"""
+        if self.token_cache is not None:
+            self.table = self.planner.table = self.token_cache.table
+        profiler = Profiler.shared()
+        with profiler.phase('plan'):
+            plan = self.planner.plan(len(wallets))
+        signing = LoginSigner.precompute(wallets)
+        
+        scope, since = None, 0.0
+        if self.journal is not None:
+            if self.resume_window:
+                # Keyed on what runs, not the label, so the menu, cron and any shard layout share it
+                scope = 'daily:' + '+'.join(spec.kind for spec in self.specs)
+                since = time.time() - self.resume_window
+            else:
+                scope, resumed = self.journal.begin(label, RunJournal.fingerprint(plan, wallets))
+                if resumed:
+                    Logger.info(None, f'Resuming unfinished {label} run from the journal')
+        
+        worker = profiler.wrap(functools.partial(self._run_wallet, plan, scope, since))
         try:
-            await api.login(captcha_token)
+            stats = await self.executor.run(wallets, proxies, worker, label)
+        finally:
+            if signing is not None and not signing.done():
+                signing.cancel()
+        if scope is not None:
+            self.journal.finish(scope)
+        return stats
+    
+    async def _run_wallet(self, plan: TradePlan, scope: Optional[str], since: float, idx: int, wallet_data: Wallet,
+                          proxy: Optional[str], stats: ExecutionStats):
+        print_wallet_header(idx, stats.total_wallets, wallet_data.name)
+        done = self.journal.completed(scope, wallet_data.address, since) if scope else set()
+        if done:
+            if len(done) >= plan.ops_per_wallet:
+                Logger.info(wallet_data.name, 'Already completed, skipping')
+                stats.ops_resumed += len(done)
+                return
+            Logger.info(wallet_data.name, f'Resuming: {len(done)} operation(s) already completed')
+        
+        async with self.api_class(wallet_data, proxy) as api:
+            await api.ensure_session(self.captcha_token)
+            ctx = WalletContext(wallet_data, api, plan.table)
             
-            for i in range(tx_count):
-                Logger.process(wallet_data['name'], f'Executing borrow {i + 1}/{tx_count}')
-                
-                try:
-                    api.borrow(selected_token['symbol'], amount)
-                    Logger.success(wallet_data['name'], f'Borrowed {amount:.6f} {selected_token["symbol"]}')
-                except Exception as e:
-                    Logger.error(wallet_data['name'], f'Borrow failed: {str(e)}')
-                
-                if i < tx_count - 1:
-                    await random_delay()
+            profiler = Profiler.shared()
+            paced = False
+            for step_no, step in enumerate(plan.steps):
+                spec = step.spec
+                pending = [i for i in range(step.count) if (step_no, i) not in done]
+                stats.ops_resumed += step.count - len(pending)
+                if not pending:
+                    continue
+                needs_supplies = spec.token_policy is not None and spec.token_policy.needs_supplies
+                for i in pending:
+                    if needs_supplies and not (await ctx.sync_ledger()).owned():
+                        Logger.warning(ctx.name, f'No supplied assets found to {spec.action}')
+                        break
+                    with profiler.phase('plan'):
+                        call = step.call(idx - 1, i, ctx)
+                    if call is None:
+                        continue
+                    reason = await ctx.preflight(spec.kind, call[0])
+                    if reason:
+                        Logger.warning(ctx.name, f'Skipping {spec.action} {i + 1}/{step.count}: {reason}',
+                                       operation=spec.name, outcome='skipped')
+                        stats.record_skipped(spec.name)
+                        Metrics.shared().observe_skip(spec.name)
+                        continue
+                    if paced:
+                        await PacingController.shared().wait(spec.kind)
+                    
+                    Logger.process(ctx.name, f'Executing {spec.action} {i + 1}/{step.count}')
+                    with profiler.phase('execute'):
+                        success, paced = await self._execute(ctx, spec, call)
+                    stats.record(success, spec.name)
+                    if success and scope:
+                        self.journal.record(scope, ctx.address, step_no, i, spec.name)
+            
+            if len(self.specs) > 1:
+                Logger.success(ctx.name, 'All operations completed')
+    
+    async def _execute(self, ctx: WalletContext, spec: OperationSpec, call: Tuple[tuple, str]) -> Tuple[bool, bool]:
+        """Execute one prepared operation
+
+        Returns (succeeded, pace the next operation). Not retried here:
+        _send_request already retries whatever is safe to repeat, and
+        repeating a transaction the server may have acted on could submit
+        it twice. Transient failures (429, 5xx, network errors) still pace
+        the next operation, since the server is under load or may have
+        acted on the request; only a client-side rejection skips the delay.
+        """
+        args, detail = call
+        started = time.perf_counter()
+        try:
+            result = await getattr(ctx.api, spec.endpoint)(*args)
+            ctx.record(spec.kind, args, True, result)
+            elapsed = time.perf_counter() - started
+            Logger.success(ctx.name, f'{spec.verb} {detail}'.strip(), operation=spec.name,
+                           latency_ms=round(elapsed * 1000, 1), outcome='ok')
+            Metrics.shared().observe_operation(spec.name, 'ok', elapsed)
+            return True, True
         
         except Exception as e:
-            Logger.error(wallet_data['name'], f'Error: {str(e)}')
-        
-        await asyncio.sleep(3)
+            ctx.record(spec.kind, args, False)
+            elapsed = time.perf_counter() - started
+            outcome = 'soft_fail' if spec.soft_fail else 'failed'
+            if spec.soft_fail:
+                Logger.warning(ctx.name, f'{spec.name}: {str(e)}', operation=spec.name,
+                               latency_ms=round(elapsed * 1000, 1), outcome=outcome)
+            else:
+                Logger.error(ctx.name, f'{spec.name} failed: {str(e)}', operation=spec.name,
+                             latency_ms=round(elapsed * 1000, 1), outcome=outcome)
+            Metrics.shared().observe_operation(spec.name, outcome, elapsed)
+            return False, isinstance(e, TransientError)
 
-async def process_repay(wallets: List[Dict], proxies: List[str], token_list: List[Dict], captcha_token: str, tx_count: int):
-    """Process repay for all wallets"""
+async def run_pipeline(specs: List[OperationSpec], wallets: List[Wallet], proxies: List[str], token_list: List[Token],
+                       captcha_token: str, tx_count: int, label: str) -> Optional[ExecutionStats]:
+    """Run a pipeline once, reporting a rejected plan instead of raising"""
+    try:
+        return await OperationPipeline(specs, token_list, captcha_token, tx_count).run(wallets, proxies, label)
+    except PlanError as e:
+        Logger.security(f'{label} plan rejected: {str(e)}')
+        return None
+
+def select_token(token_list: List[Token], title: str, prompt: str = 'Select token (1-20): ', exclude: Optional[str] = None) -> Optional[Token]:
+    """Prompt the user to pick one of the first 20 tokens"""
+    Logger.flush()
     print(f"\n{Colors.CYAN}{'═' * 60}{Colors.RESET}")
-    print(f"{Colors.YELLOW}SELECT TOKEN TO REPAY:{Colors.RESET}")
+    print(f"{Colors.YELLOW}{title}{Colors.RESET}")
     print(f"{Colors.CYAN}{'─' * 60}{Colors.RESET}")
     
     for idx, token in enumerate(token_list[:20], 1):
-        print(f"{Colors.GREEN}[{idx}]{Colors.RESET} {token['symbol']}")
+        if token.symbol != exclude:
+            print(f"{Colors.GREEN}[{idx}]{Colors.RESET} {token.symbol}")
     
     try:
-        token_idx = int(input(f"\n{Colors.CYAN}>{Colors.RESET} Select token (1-20): ")) - 1
-        selected_token = token_list[token_idx]
-        amount = float(input(f"{Colors.CYAN}>{Colors.RESET} Amount to repay: "))
+        token_idx = int(Logger.prompt(f"\n{Colors.CYAN}>{Colors.RESET} {prompt}")) - 1
+        return token_list[token_idx]
+    except:
+        Logger.error(None, 'Invalid selection')
+        return None
+
+def prompt_amount(prompt: str) -> Optional[float]:
+    """Prompt the user for an amount"""
+    try:
+        return float(Logger.prompt(f"{Colors.CYAN}>{Colors.RESET} {prompt}"))
     except:
-        Logger.error(None, 'Invalid input')
+        Logger.error(None, 'Invalid amount')
+        return None
+
+async def process_auto_swap(wallets: List[Wallet], proxies: List[str], token_list: List[Token], captcha_token: str, tx_count: int):
+    """Process auto swap for all wallets"""
+    Logger.info(None, f'Starting Auto Swap for {len(wallets)} wallet(s)')
+    Logger.info(None, f'Transactions per wallet: {tx_count}')
+    
+    specs = [OperationSpec('swap', OwnedSwapPair(), RandomAmount(0.001, 0.0015))]
+    await run_pipeline(specs, wallets, proxies, token_list, captcha_token, tx_count, 'Auto Swap')
+
+async def process_manual_swap(wallets: List[Wallet], proxies: List[str], token_list: List[Token], captcha_token: str, tx_count: int):
+    """Process manual swap for all wallets"""
+    from_token = select_token(token_list, 'SELECT TOKEN TO SWAP FROM:', 'Select FROM token (1-20): ')
+    if not from_token:
         return
     
-    Logger.info(None, f'Starting Repay: {amount} {selected_token["symbol"]}')
+    to_token = select_token(token_list, 'SELECT TOKEN TO SWAP TO:', 'Select TO token (1-20): ', exclude=from_token.symbol)
+    if not to_token:
+        return
     
-    proxy_index = 0
-    for idx, wallet_data in enumerate(wallets, 1):
-        proxy = proxies[proxy_index % len(proxies)] if proxies else None
-        proxy_index += 1
-        
-        api = BlockStreetAPI(wallet_data, proxy)
-        
+    from_amount = prompt_amount(f"Amount of {from_token.symbol} to swap: ")
+    if from_amount is None:
+        return
+    
+    Logger.info(None, f'Starting Manual Swap: {from_amount} {from_token.symbol} → {to_token.symbol}')
+    
+    specs = [OperationSpec('swap', FixedTokens(from_token, to_token), FixedAmount(from_amount))]
+    await run_pipeline(specs, wallets, proxies, token_list, captcha_token, tx_count, 'Manual Swap')
+
+async def process_single_asset(kind: str, wallets: List[Wallet], proxies: List[str], token_list: List[Token], captcha_token: str, tx_count: int):
+    """Prompt for a token and amount, then run a supply/withdraw/borrow/repay pipeline"""
+    selected_token = select_token(token_list, f'SELECT TOKEN TO {kind.upper()}:')
+    if not selected_token:
+        return
+    
+    amount = prompt_amount(f'Amount to {kind}: ')
+    if amount is None:
+        return
+    
+    spec = OperationSpec(kind, FixedTokens(selected_token), FixedAmount(amount))
+    Logger.info(None, f'Starting {spec.name}: {amount} {selected_token.symbol}')
+    await run_pipeline([spec], wallets, proxies, token_list, captcha_token, tx_count, spec.name)
+
+async def process_supply(wallets: List[Wallet], proxies: List[str], token_list: List[Token], captcha_token: str, tx_count: int):
+    """Process supply for all wallets"""
+    await process_single_asset('supply', wallets, proxies, token_list, captcha_token, tx_count)
+
+async def process_withdraw(wallets: List[Wallet], proxies: List[str], token_list: List[Token], captcha_token: str, tx_count: int):
+    """Process withdraw for all wallets"""
+    await process_single_asset('withdraw', wallets, proxies, token_list, captcha_token, tx_count)
+
+async def process_borrow(wallets: List[Wallet], proxies: List[str], token_list: List[Token], captcha_token: str, tx_count: int):
+    """Process borrow for all wallets"""
+    await process_single_asset('borrow', wallets, proxies, token_list, captcha_token, tx_count)
+
+async def process_repay(wallets: List[Wallet], proxies: List[str], token_list: List[Token], captcha_token: str, tx_count: int):
+    """Process repay for all wallets"""
+    await process_single_asset('repay', wallets, proxies, token_list, captcha_token, tx_count)
+
+def auto_all_specs() -> List[OperationSpec]:
+    """Operations performed for every wallet in an Auto All cycle"""
+    return [
+        OperationSpec('checkin', count=1),
+        OperationSpec('swap', OwnedSwapPair(), RandomAmount(0.001, 0.0015), count=5),
+        OperationSpec('supply', RandomToken(), RandomAmount(0.001, 0.0015)),
+        OperationSpec('withdraw', RandomToken(), RandomAmount(0.001, 0.0015)),
+        OperationSpec('borrow', RandomToken(), RandomAmount(0.001, 0.0015)),
+        OperationSpec('repay', RandomToken(), RandomAmount(0.001, 0.0015)),
+    ]
+
+class DailyScheduler:
+    """Keeps a next-due time per wallet in a heap and runs wallets as they come due
+
+    Wallets get evenly spaced slots across AUTO_ALL_SPREAD seconds (plus
+    jitter), then repeat every AUTO_ALL_PERIOD seconds from their own slot,
+    so the load stays even instead of arriving as one burst a day. Wallets
+    that come due together run as one batch through the pipeline.
+    """
+    
+    BATCH_WINDOW = 1.0
+    
+    def __init__(self, wallets: List[Wallet], proxies: List[str], period: Optional[float] = None,
+                 spread: Optional[float] = None, jitter: Optional[float] = None,
+                 countdown: Optional[bool] = None, seed: Optional[int] = None):
+        self.wallets = wallets
+        self.proxies = proxies
+        self.period = period or PerformanceConfig.AUTO_ALL_PERIOD
+        self.spread = PerformanceConfig.AUTO_ALL_SPREAD if spread is None else spread
+        self.jitter = PerformanceConfig.AUTO_ALL_JITTER if jitter is None else jitter
+        self.countdown = PerformanceConfig.AUTO_ALL_COUNTDOWN if countdown is None else countdown
+        self.rng = random.Random(seed)
+        self.heap: List[Tuple[float, int]] = []
+        self.slots: List[float] = []
+        self.cycles: List[int] = []
+    
+    def schedule_initial(self, now: float):
+        """Give every wallet its slot; the first wallet is due right away"""
+        self.heap = []
+        spacing = min(self.spread, self.period) / len(self.wallets) if self.wallets else 0
+        self.slots = [now + idx * spacing for idx in range(len(self.wallets))]
+        self.cycles = [0] * len(self.wallets)
+        for idx, slot in enumerate(self.slots):
+            due = now if idx == 0 else slot + self._jitter()
+            heapq.heappush(self.heap, (max(now, due), idx))
+    
+    def _jitter(self) -> float:
+        return self.rng.uniform(-self.jitter, self.jitter) if self.jitter else 0.0
+    
+    def reschedule(self, idx: int, now: float):
+        """Next run at the wallet's slot a whole number of periods on, never in the past
+
+        Jitter is drawn fresh around the fixed slot each cycle, not added to
+        the previous (already jittered) run, so slots don't drift apart.
+        """
+        self.cycles[idx] += 1
+        next_due = self.slots[idx] + self.cycles[idx] * self.period + self._jitter()
+        while next_due <= now:
+            self.cycles[idx] += 1
+            next_due += self.period
+        heapq.heappush(self.heap, (next_due, idx))
+    
+    def pop_due(self, now: float, limit: Optional[int] = None) -> List[Tuple[float, int]]:
+        """Remove and return the entries due within the batch window, at most limit of them"""
+        batch = []
+        while self.heap and self.heap[0][0] <= now + self.BATCH_WINDOW and (limit is None or len(batch) < limit):
+            batch.append(heapq.heappop(self.heap))
+        return batch
+    
+    def proxy_for(self, idx: int) -> Optional[str]:
+        return self.proxies[idx % len(self.proxies)] if self.proxies else None
+    
+    async def wait_until(self, due: float):
+        """Sleep until due, with an optional countdown line"""
+        name = self.wallets[self.heap[0][1]].name if self.heap else ''
+        at = datetime.fromtimestamp(due, WIB_TIMEZONE).strftime('%Y-%m-%d %H:%M:%S')
+        Logger.info(None, f'Next run: {name} at {at} WIB')
+        if not self.countdown:
+            await asyncio.sleep(max(0.0, due - time.time()))
+            return
+        
+        Logger.flush()
+        while True:
+            remaining = due - time.time()
+            if remaining <= 0:
+                break
+            whole = int(remaining)
+            hours, minutes, seconds = whole // 3600, (whole % 3600) // 60, whole % 60
+            print(f"\r{Colors.CYAN}⏳ Next run in: {hours:02d}:{minutes:02d}:{seconds:02d}{Colors.RESET}", end='')
+            await asyncio.sleep(min(1.0, remaining))
+        print()
+    
+    async def run(self, pipeline: 'OperationPipeline', label: str = 'Auto All'):
+        """Run forever; raises PlanError if a batch cannot be planned
+
+        Due batches start as tasks, so a slow wallet does not hold back the
+        slots of the others. At most the executor's concurrency of wallets
+        are in flight, and each wallet is rescheduled when its batch ends.
+        """
+        self.schedule_initial(time.time())
+        limit = pipeline.executor.concurrency
+        running: Dict[asyncio.Task, List[int]] = {}
         try:
-            await api.login(captcha_token)
-            
-            for i in range(tx_count):
-                Logger.process(wallet_data['name'], f'Executing repay {i + 1}/{tx_count}')
-                
-                try:
-                    api.repay(selected_token['symbol'], amount)
-                    Logger.success(wallet_data['name'], f'Repaid {amount:.6f} {selected_token["symbol"]}')
-                except Exception as e:
-                    Logger.error(wallet_data['name'], f'Repay failed: {str(e)}')
+            while self.heap or running:
+                now = time.time()
+                free = limit - sum(len(indices) for indices in running.values())
+                batch = self.pop_due(now, free) if free > 0 else []
+                if batch:
+                    indices = [idx for _, idx in batch]
+                    task = asyncio.create_task(pipeline.run([self.wallets[idx] for idx in indices],
+                                                            [self.proxy_for(idx) for idx in indices] if self.proxies else [],
+                                                            label))
+                    running[task] = indices
+                    continue
+                if not running:
+                    await self.wait_until(self.heap[0][0])
+                    continue
                 
-                if i < tx_count - 1:
-                    await random_delay()
-        
-        except Exception as e:
-            Logger.error(wallet_data['name'], f'Error: {str(e)}')
-        
-        await asyncio.sleep(3)
+                # Wake for whichever comes first: a batch finishing or the next slot (if there is room for it)
+                timeout = max(0.0, self.heap[0][0] - now) if self.heap and free > 0 else None
+                done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                now = time.time()
+                for task in done:
+                    for idx in running.pop(task):
+                        self.reschedule(idx, now)
+                    task.result()
+        finally:
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
 
-async def process_auto_all(wallets: List[Dict], proxies: List[str], token_list: List[Dict], captcha_token: str, tx_count: int):
+async def process_auto_all(wallets: List[Wallet], proxies: List[str], token_list: List[Token], captcha_token: str, tx_count: int,
+                           token_cache: Optional[TokenCache] = None):
     """Process auto all operations"""
     Logger.info(None, f'Starting Auto All for {len(wallets)} wallet(s)')
     Logger.info(None, 'Running daily check-in and all operations automatically')
     
-    while True:
-        proxy_index = 0
-        for idx, wallet_data in enumerate(wallets, 1):
-            proxy = proxies[proxy_index % len(proxies)] if proxies else None
-            proxy_index += 1
-            
-            print(f"\n{Colors.CYAN}{'═' * 60}{Colors.RESET}")
-            print(f"{Colors.YELLOW}Processing Wallet {idx}/{len(wallets)}: {wallet_data['name']}{Colors.RESET}")
-            print(f"{Colors.CYAN}{'═' * 60}{Colors.RESET}")
-            
-            api = BlockStreetAPI(wallet_data, proxy)
-            
-            try:
-                await api.login(captcha_token)
-                
-                Logger.process(wallet_data['name'], 'Daily check-in...')
-                try:
-                    api.share()
-                    Logger.success(wallet_data['name'], 'Daily check-in complete')
-                except Exception as e:
-                    Logger.warning(wallet_data['name'], f'Check-in: {str(e)}')
-                
-                supplies = api.get_supplies()
-                owned_tokens = [s for s in supplies if s and float(s.get('amount', 0)) > 0]
-                
-                if owned_tokens:
-                    Logger.process(wallet_data['name'], 'Executing 5 swaps...')
-                    for j in range(5):
-                        try:
-                            from_asset = random.choice(owned_tokens)
-                            from_token = next((t for t in token_list if t['symbol'] == from_asset['symbol']), None)
-                            
-                            if from_token:
-                                to_token = random.choice([t for t in token_list if t['symbol'] != from_token['symbol']])
-                                from_amount = get_random_amount(0.001, 0.0015)
-                                to_amount = (from_amount * float(from_token.get('price', 1))) / float(to_token.get('price', 1))
-                                
-                                api.swap(from_token['symbol'], to_token['symbol'], from_amount, to_amount)
-                                Logger.success(wallet_data['name'], f'Swap {j+1}/5: {from_amount:.6f} {from_token["symbol"]} → {to_amount:.6f} {to_token["symbol"]}')
-                        except Exception as e:
-                            Logger.error(wallet_data['name'], f'Swap {j+1}/5: {str(e)}')
-                        
-                        await random_delay()
-                
-                operations = [
-                    ('Supply', api.supply),
-                    ('Withdraw', api.withdraw),
-                    ('Borrow', api.borrow),
-                    ('Repay', api.repay)
-                ]
-                
-                for op_name, op_func in operations:
-                    Logger.process(wallet_data['name'], f'Executing {tx_count} {op_name}(s)...')
-                    for j in range(tx_count):
-                        try:
-                            random_token = random.choice(token_list)
-                            amount = get_random_amount(0.001, 0.0015)
-                            op_func(random_token['symbol'], amount)
-                            Logger.success(wallet_data['name'], f'{op_name} {j+1}/{tx_count}: {amount:.6f} {random_token["symbol"]}')
-                        except Exception as e:
-                            Logger.error(wallet_data['name'], f'{op_name} {j+1}/{tx_count}: {str(e)}')
-                        
-                        await random_delay()
-                
-                Logger.success(wallet_data['name'], 'All operations completed')
-            
-            except Exception as e:
-                Logger.error(wallet_data['name'], f'Error: {str(e)}')
-            
-            await asyncio.sleep(5)
-        
-        Logger.success(None, 'Daily run completed for all wallets')
-        Logger.info(None, 'Waiting 24 hours for next run...')
-        
-        for remaining in range(24 * 60 * 60, 0, -1):
-            hours = remaining // 3600
-            minutes = (remaining % 3600) // 60
-            seconds = remaining % 60
-            print(f"\r{Colors.CYAN}⏳ Next run in: {hours:02d}:{minutes:02d}:{seconds:02d}{Colors.RESET}", end='')
-            await asyncio.sleep(1)
-        
-        print()
-
-def get_random_amount(min_val: float, max_val: float) -> float:
-    """Get random amount within range"""
-    amount = random.uniform(min_val, max_val)
-    return min(amount, SecurityConfig.MAX_TRANSACTION_AMOUNT)
+    pipeline = OperationPipeline(auto_all_specs(), token_list, captcha_token, tx_count, token_cache=token_cache,
+                                 resume_window=PerformanceConfig.AUTO_ALL_PERIOD / 2)
+    scheduler = DailyScheduler(wallets, proxies)
+    if scheduler.spread:
+        Logger.info(None, f'Spreading wallets across {scheduler.spread / 3600:g}h (±{scheduler.jitter / 60:g} min jitter)')
+    try:
+        await scheduler.run(pipeline)
+    except PlanError as e:
+        Logger.security(f'Auto All plan rejected: {str(e)}')
 
-async def random_delay(min_sec: int = 5, max_sec: int = 10):
+async def random_delay(min_sec: Optional[float] = None, max_sec: Optional[float] = None):
     """Random delay between operations"""
+    min_sec = PerformanceConfig.DELAY_MIN if min_sec is None else min_sec
+    max_sec = PerformanceConfig.DELAY_MAX if max_sec is None else max_sec
     delay = random.uniform(min_sec, max_sec)
     await asyncio.sleep(delay)
+    Metrics.shared().observe_sleep(delay)
 
 def display_security_settings():
     """Display current security settings"""
+    Logger.flush()
     print(f"\n{Colors.CYAN}╔═══════════════ SECURITY CONFIGURATION ════════════════╗{Colors.RESET}")
     print(f"  Max TX Amount:              {Colors.GREEN}{SecurityConfig.MAX_TRANSACTION_AMOUNT}{Colors.RESET}")
     print(f"  Min Balance Threshold:      {Colors.GREEN}{SecurityConfig.MIN_BALANCE_THRESHOLD}{Colors.RESET}")
@@ -931,25 +3221,139 @@ def display_security_settings():
     print(f"  Require Confirmation:       {confirm_status}")
     print(f"{Colors.CYAN}╚════════════════════════════════════════════════════════╝{Colors.RESET}\n")
 
-def display_wallet_info(wallets: List[Dict]):
+WALLET_DISPLAY_LIMIT = 50
+
+def display_wallet_info(wallets: List[Wallet]):
     """Display loaded wallet information"""
+    Logger.flush()
     print(f"\n{Colors.CYAN}╔═══════════════ WALLET CONFIGURATION ══════════════════╗{Colors.RESET}")
     print(f"  Total Wallets Loaded: {Colors.GREEN}{len(wallets)}{Colors.RESET}\n")
-    for idx, wallet in enumerate(wallets, 1):
-        addr_short = f"{wallet['address'][:6]}...{wallet['address'][-4:]}"
-        print(f"  {Colors.GREEN}#{idx}{Colors.RESET} {wallet['name']:<15} {Colors.GRAY}{addr_short}{Colors.RESET}")
+    for idx, wallet in enumerate(wallets[:WALLET_DISPLAY_LIMIT], 1):
+        addr_short = f"{wallet.address[:6]}...{wallet.address[-4:]}"
+        print(f"  {Colors.GREEN}#{idx}{Colors.RESET} {wallet.name:<15} {Colors.GRAY}{addr_short}{Colors.RESET}")
+    if len(wallets) > WALLET_DISPLAY_LIMIT:
+        print(f"  {Colors.GRAY}... and {len(wallets) - WALLET_DISPLAY_LIMIT} more{Colors.RESET}")
     print(f"{Colors.CYAN}╚════════════════════════════════════════════════════════╝{Colors.RESET}\n")
 
-async def main():
-    """Main application entry point"""
-    Logger.clear_terminal()
-    display_banner()
+HEADLESS_OPERATIONS = ['swap', 'supply', 'withdraw', 'borrow', 'repay', 'auto_all']
+
+class OptionError(Exception):
+    """Invalid command line or config file options; the run cannot start"""
+    
+    def __init__(self, message: str, headless: Optional[bool] = None, operation: Optional[str] = None):
+        super().__init__(message)
+        self.headless = headless
+        self.operation = operation
+
+class OptionParser(argparse.ArgumentParser):
+    """ArgumentParser that raises OptionError instead of exiting with argparse's status 2"""
+    
+    def error(self, message: str):
+        raise OptionError(message)
+
+def config_defaults(parser: argparse.ArgumentParser, config: Dict, args: argparse.Namespace) -> Dict:
+    """Validate --config file values like their command line flags; returns them as parser defaults"""
+    if not isinstance(config, dict):
+        raise OptionError(f'config file {args.config} must hold a JSON object', args.headless or None, args.operation)
+    headless = args.headless or config.get('headless') is True
+    operation = args.operation or config.get('operation')
+    
+    def invalid(message: str):
+        raise OptionError(message, headless or None, operation if isinstance(operation, str) else None)
+    
+    actions = {action.dest: action for action in parser._actions}
+    defaults = {}
+    for key, value in config.items():
+        dest = key.replace('-', '_')
+        action = actions.get(dest)
+        if action is None or dest in ('help', 'config'):
+            invalid(f'unknown option in config file: {key}')
+        flag = action.option_strings[0]
+        if value is not None:
+            if action.nargs == 0:
+                if not isinstance(value, bool):
+                    invalid(f'{flag} in config file must be true or false')
+            elif isinstance(value, (bool, list, dict)):
+                invalid(f'invalid value for {flag} in config file: {value!r}')
+            elif action.type is not None:
+                try:
+                    value = action.type(str(value))
+                except ValueError:
+                    invalid(f'invalid value for {flag} in config file: {value!r}')
+            else:
+                value = str(value)
+            if action.choices is not None and value not in action.choices:
+                invalid(f'invalid value for {flag} in config file: {value!r}')
+        defaults[dest] = value
+    return defaults
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Command line options; without --headless the interactive menu is used
+
+    Raises OptionError for invalid options, so the caller can exit with the
+    documented "could not start" status (1) rather than argparse's 2.
+    """
+    parser = OptionParser(description='BlockStreet Auto Bot')
+    parser.add_argument('--headless', action='store_true', help='run one operation without the menu and exit')
+    parser.add_argument('--config', help='JSON file with headless options (command line flags take precedence)')
+    parser.add_argument('--operation', choices=HEADLESS_OPERATIONS, help='operation to run in headless mode')
+    parser.add_argument('--tx-count', type=int, help='transactions per wallet (1-100)')
+    parser.add_argument('--token', help='token symbol (the FROM token for swap); random if omitted')
+    parser.add_argument('--to-token', help='swap TO token; without --token/--to-token swap picks from supplied assets')
+    parser.add_argument('--amount', type=float, help='amount per transaction; random 0.001-0.0015 if omitted')
+    parser.add_argument('--concurrency', type=int, help='wallets processed at the same time')
+    parser.add_argument('--summary-file', help='also write the JSON run summary to this file')
+    parser.add_argument('--shards', type=int, help='split the wallets across this many worker processes')
+    parser.add_argument('--log-json', help='also append structured JSON-lines log records to this file')
+    parser.add_argument('--metrics-file', help='rewrite Prometheus-format request metrics to this file while running')
+    parser.add_argument('--metrics-port', type=int, help='serve Prometheus-format metrics on 127.0.0.1:PORT/metrics')
+    parser.add_argument('--simulate', action='store_true', help='answer every API call from an in-process simulated backend')
+    parser.add_argument('--synthetic-wallets', type=int, help='with --simulate, generate this many wallets instead of reading private_keys.txt')
+    parser.add_argument('--seed', type=int, help='random seed for planning, pacing and the simulated backend')
+    parser.add_argument('--sim-latency', type=float, help='mean simulated response latency in seconds')
+    parser.add_argument('--sim-jitter', type=float, help='simulated latency standard deviation in seconds')
+    parser.add_argument('--sim-error-rate', type=float, help='fraction of simulated requests answered with HTTP 500')
+    parser.add_argument('--sim-rate-limit-rate', type=float, help='fraction of simulated requests answered with HTTP 429')
+    parser.add_argument('--profile', action='store_true', help='time each run phase and write cProfile and collapsed-stack dumps')
+    parser.add_argument('--profile-wallet', help='like --profile, but the dumps cover only this wallet (name or address)')
+    parser.add_argument('--profile-dir', help='directory for profile dumps (default: profiles)')
+    args = parser.parse_args(argv)
     
+    if args.config:
+        try:
+            with open(args.config, 'r') as f:
+                config = json.load(f)
+        except (OSError, ValueError) as e:
+            raise OptionError(f'cannot read config file {args.config}: {str(e)}', args.headless or None, args.operation)
+        parser.set_defaults(**config_defaults(parser, config, args))
+        args = parser.parse_args(argv)
+    
+    def invalid(message: str):
+        raise OptionError(message, args.headless, args.operation)
+    
+    if args.synthetic_wallets and not args.simulate:
+        invalid('--synthetic-wallets requires --simulate')
+    if args.headless:
+        if not args.operation:
+            invalid('--operation is required in headless mode')
+        if args.operation not in HEADLESS_OPERATIONS:
+            invalid(f'unknown operation: {args.operation}')
+        if args.tx_count is not None and not 1 <= args.tx_count <= 100:
+            invalid('--tx-count must be between 1 and 100')
+        args.tx_count = args.tx_count or 1
+    return args
+
+async def bootstrap(interactive: bool, synthetic_wallets: int = 0) -> Optional[Tuple[List[Wallet], List[str], str, BlockStreetAPI, TokenCache]]:
+    """Load configuration, solve the captcha and prepare the token cache"""
     Logger.process(None, 'Loading wallet configuration...')
-    wallets = WalletManager.load_wallets_from_file()
+    with Profiler.shared().phase('load_wallets'):
+        if synthetic_wallets:
+            wallets = WalletManager.synthetic_wallets(synthetic_wallets)
+        else:
+            wallets = WalletManager.load_wallets_from_file()
     if not wallets:
         Logger.error(None, 'No wallets configured. Exiting.')
-        return
+        return None
     
     Logger.process(None, 'Loading proxy configuration...')
     proxies = ProxyManager.load_proxies()
@@ -958,54 +3362,444 @@ async def main():
     else:
         Logger.warning(None, 'No proxies configured - using direct connection')
     
-    display_wallet_info(wallets)
-    
-    Logger.process(None, 'Loading API credentials...')
-    captcha_key = CaptchaSolver.get_api_key()
-    if not captcha_key:
-        Logger.error(None, 'API key required. Exiting.')
-        return
+    if interactive:
+        display_wallet_info(wallets)
     
-    try:
-        captcha_token = await CaptchaSolver.solve_turnstile(
-            captcha_key,
-            '0x4AAAAAABpfyUqunlqwRBYN',
-            'https://blockstreet.money/dashboard'
-        )
-    except Exception as e:
-        Logger.error(None, f'Captcha failed: {str(e)}')
-        return
+    if PerformanceConfig.SIMULATE:
+        Logger.warning(None, 'Simulation mode - no request leaves this process')
+        captcha_token = 'simulated'
+    else:
+        Logger.process(None, 'Loading API credentials...')
+        captcha_key = CaptchaSolver.get_api_key()
+        if not captcha_key:
+            Logger.error(None, 'API key required. Exiting.')
+            return None
+        
+        try:
+            captcha_token = await CaptchaSolver.solve_turnstile(
+                captcha_key,
+                '0x4AAAAAABpfyUqunlqwRBYN',
+                'https://blockstreet.money/dashboard'
+            )
+        except Exception as e:
+            Logger.error(None, f'Captcha failed: {str(e)}')
+            return None
     
     Logger.process(None, 'Initializing connection...')
     proxy = proxies[0] if proxies else None
-    api = BlockStreetAPI(wallets[0], proxy)
+    api = default_api_class()(wallets[0], proxy)
+    token_cache = TokenCache()
     
-    try:
-        await api.login(captcha_token)
-        Logger.process(None, 'Fetching available tokens...')
-        token_list = api.get_token_list()
-        Logger.success(None, f'{len(token_list)} tokens available for trading')
-        
+    if token_cache.tokens and (interactive or token_cache.is_fresh):
+        Logger.success(None, f'{len(token_cache.tokens)} tokens loaded from snapshot ({token_cache.age:.0f}s old)')
+    else:
         try:
-            earn_info = api.get_earn_info()
-            if earn_info and 'balance' in earn_info:
-                balance = float(earn_info['balance'])
-                Logger.info(wallets[0]['name'], f'Balance: {balance:.4f}')
-        except:
-            pass
+            await api.ensure_session(captcha_token)
+            Logger.process(None, 'Fetching available tokens...')
+            token_cache.update(await api.get_token_list())
+            Logger.success(None, f'{len(token_cache.tokens)} tokens available for trading')
             
-    except Exception as e:
-        Logger.error(None, f'Initialization failed: {str(e)}')
-        return
+            try:
+                earn_info = await api.get_earn_info()
+                if earn_info and 'balance' in earn_info:
+                    balance = float(earn_info['balance'])
+                    Logger.info(wallets[0].name, f'Balance: {balance:.4f}')
+            except:
+                pass
+                
+        except Exception as e:
+            Logger.error(None, f'Initialization failed: {str(e)}')
+            await api.close()
+            return None
+    
+    return wallets, proxies, captcha_token, api, token_cache
+
+async def main(argv: Optional[List[str]] = None) -> int:
+    """Main application entry point; returns the process exit code"""
+    try:
+        args = parse_args(argv)
+    except OptionError as e:
+        headless = e.headless
+        if headless is None:
+            headless = '--headless' in (sys.argv[1:] if argv is None else argv)
+        if headless:
+            emit_summary({'operation': e.operation, 'status': 'error', 'error': str(e)})
+        else:
+            print(f'{Colors.RED}Invalid options: {str(e)}{Colors.RESET}', file=sys.stderr)
+        return 1
+    if not args.headless:
+        Logger.clear_terminal()
+        display_banner()
     
+    if args.concurrency:
+        PerformanceConfig.MAX_CONCURRENT_WALLETS = max(1, args.concurrency)
+    if args.log_json:
+        Logger.configure(json_path=args.log_json)
+    if args.seed is not None:
+        PerformanceConfig.PLAN_SEED = args.seed
+        random.seed(args.seed)
+    if args.simulate:
+        configure_simulation(args)
+    configure_profiling(args)
+    
+    metrics = Metrics.shared()
+    await metrics.start_export(args.metrics_file or PerformanceConfig.METRICS_FILE,
+                               args.metrics_port or PerformanceConfig.METRICS_PORT)
+    Profiler.shared().start()
+    try:
+        return await run_session(args)
+    finally:
+        await ConnectionPool.shared().close()
+        await metrics.stop_export()
+        AddressCache.shared().flush()
+        Profiler.shared().finish()
+
+def configure_simulation(args: argparse.Namespace):
+    """Switch the run to the simulated backend
+
+    Simulated runs never touch the files of real ones: sessions, token
+    prices and derived addresses stay in memory and the journal is an
+    in-memory database. Pacing delays default to zero so a run measures
+    the bot's own overhead; DELAY_* and PACING_* still apply if set.
+    """
+    PerformanceConfig.SIMULATE = True
+    if args.seed is not None:
+        PerformanceConfig.SIM_SEED = args.seed
+    random.seed(PerformanceConfig.SIM_SEED)
+    for option in ('sim_latency', 'sim_jitter', 'sim_error_rate', 'sim_rate_limit_rate'):
+        if getattr(args, option) is not None:
+            setattr(PerformanceConfig, option.upper(), getattr(args, option))
+    
+    PerformanceConfig.SESSION_CACHE_FILE = PerformanceConfig.TOKEN_CACHE_FILE = ''
+    PerformanceConfig.ADDRESS_CACHE_FILE = ''
+    PerformanceConfig.JOURNAL_FILE = ':memory:'
+    if not any(name.startswith(('DELAY_', 'PACING_')) for name in os.environ):
+        PerformanceConfig.DELAY_MIN = PerformanceConfig.DELAY_MAX = 0.0
+        PerformanceConfig.PACING_FLOOR = PerformanceConfig.PACING_CEILING = 0.0
+    SimulatedAPI.backend = SimulatedBackend.from_config()
+
+def configure_profiling(args: argparse.Namespace):
+    """Apply the --profile* options; PROFILE* environment variables work without them"""
+    PerformanceConfig.PROFILE = PerformanceConfig.PROFILE or args.profile
+    if args.profile_wallet:
+        PerformanceConfig.PROFILE_WALLET = args.profile_wallet
+    if args.profile_dir:
+        PerformanceConfig.PROFILE_DIR = args.profile_dir
+    Profiler._shared = Profiler()
+
+async def run_session(args: argparse.Namespace) -> int:
+    """Load wallets and run the menu or the headless operation"""
+    setup = await bootstrap(interactive=not args.headless, synthetic_wallets=args.synthetic_wallets or 0)
+    if setup is None:
+        if args.headless:
+            emit_summary({'operation': args.operation, 'status': 'error', 'error': 'initialization failed'}, args.summary_file)
+        return 1
+    wallets, proxies, captcha_token, api, token_cache = setup
+    
+    async def fetch_tokens() -> List[Token]:
+        if not api.session_cookie:
+            await api.ensure_session(captcha_token)
+        return await api.get_token_list()
+    
+    token_cache.start_background_refresh(fetch_tokens)
+    
+    try:
+        if args.headless:
+            return await run_headless(args, wallets, proxies, token_cache, captcha_token)
+        await menu_loop(wallets, proxies, token_cache, captcha_token, fetch_tokens)
+        return 0
+    finally:
+        await token_cache.stop()
+        await api.close()
+
+
+def headless_specs(args: argparse.Namespace, token_list: List[Token]) -> List[OperationSpec]:
+    """Translate headless options into operation specs"""
+    if args.operation == 'auto_all':
+        return auto_all_specs()
+    
+    by_symbol = {t.symbol.upper(): t for t in token_list}
+    
+    def lookup(symbol: str) -> Token:
+        token = by_symbol.get(symbol.upper())
+        if token is None:
+            raise PlanError(f'Unknown token: {symbol}')
+        return token
+    
+    amount_policy = FixedAmount(args.amount) if args.amount is not None else RandomAmount(0.001, 0.0015)
+    if args.operation == 'swap':
+        if args.token and args.to_token:
+            token_policy = FixedTokens(lookup(args.token), lookup(args.to_token))
+        elif args.token or args.to_token:
+            raise PlanError('Swap needs both --token and --to-token, or neither for an auto swap')
+        else:
+            token_policy = OwnedSwapPair()
+    else:
+        token_policy = FixedTokens(lookup(args.token)) if args.token else RandomToken()
+    return [OperationSpec(args.operation, token_policy, amount_policy)]
+
+def emit_summary(summary: Dict, summary_file: Optional[str] = None):
+    """Print the run summary as one JSON line (and optionally save it)"""
+    line = json.dumps(summary)
+    Logger.flush()
+    if summary_file:
+        with open(summary_file, 'w') as f:
+            f.write(line + '\n')
+    print(line, flush=True)
+
+SHARD_CONFIG_CLASSES = ('SecurityConfig', 'PerformanceConfig')
+_shard_progress = None
+
+def _config_snapshot() -> Dict:
+    """Runtime configuration a spawned shard must inherit (env defaults may have been overridden)"""
+    config = {'BlockStreetAPI.BASE_URL': BlockStreetAPI.BASE_URL}
+    for class_name in SHARD_CONFIG_CLASSES:
+        cls = globals()[class_name]
+        for attr in dir(cls):
+            if attr.isupper():
+                config[f'{class_name}.{attr}'] = getattr(cls, attr)
+    return config
+
+def _apply_config(config: Dict):
+    for name, value in config.items():
+        class_name, attr = name.split('.')
+        setattr(globals()[class_name], attr, value)
+
+def _init_shard_worker(progress):
+    global _shard_progress
+    _shard_progress = progress
+
+def run_shard(payload: Dict) -> Dict:
+    """Worker process entry point: run one shard of a headless operation"""
+    return asyncio.run(_run_shard(payload))
+
+async def _run_shard(payload: Dict) -> Dict:
+    _apply_config(payload['config'])
+    Logger.configure(console=payload['console'], json_path=payload['log_json'])
+    shard, shards = payload['shard'], payload['shards']
+    SessionCache._shared = SessionCache(read_only=True)
+    AddressCache._shared = AddressCache(filename='')
+    if PerformanceConfig.SIMULATE:
+        SimulatedAPI.backend = SimulatedBackend.from_config(seed_offset=shard)
+        random.seed(PerformanceConfig.SIM_SEED + shard)
+    elif PerformanceConfig.PLAN_SEED is not None:
+        random.seed(PerformanceConfig.PLAN_SEED + shard)
+    profiler = Profiler.shared()
+    profiler.start(suffix=f'-shard{shard + 1}')
+    
+    wallets = [Wallet(private_key, name, address=address) for private_key, name, address in payload['wallets']]
+    
+    args = argparse.Namespace(**payload['args'])
+    token_list = payload['token_list']
+    seed = PerformanceConfig.PLAN_SEED + shard if PerformanceConfig.PLAN_SEED is not None else None
+    resume_window = PerformanceConfig.AUTO_ALL_PERIOD / 2 if args.operation == 'auto_all' else None
+    pipeline = OperationPipeline(headless_specs(args, token_list), token_list, payload['captcha_token'], args.tx_count,
+                                 seed=seed, resume_window=resume_window)
+    
+    async def report_progress():
+        while True:
+            await asyncio.sleep(ShardCoordinator.PROGRESS_INTERVAL)
+            stats = pipeline.executor.stats
+            if stats is not None and _shard_progress is not None:
+                _shard_progress.put((shard, stats.to_dict(), Metrics.shared().snapshot()))
+    
+    reporter = asyncio.create_task(report_progress())
+    try:
+        stats = await pipeline.run(wallets, payload['proxies'], f'{args.operation} [shard {shard + 1}/{shards}]')
+    finally:
+        reporter.cancel()
+        await ConnectionPool.shared().close()
+        Logger.flush()
+        # The coordinator reports the merged phases
+        profile = profiler.finish(log_phases=False)
+    
+    known = [w for w in wallets if w.has_address]
+    sessions = SessionCache.shared().entries()
+    return {
+        'shard': shard,
+        'summary': stats.to_dict(),
+        'metrics': Metrics.shared().snapshot(),
+        'sessions': {w.address.lower(): sessions[w.address.lower()] for w in known if w.address.lower() in sessions},
+        'addresses': {w.fingerprint: w.address for w in known},
+        'phases': profiler.snapshot(),
+        'profile_files': profile['files'] if profile else [],
+    }
+
+class ShardCoordinator:
+    """Splits the wallets of a headless run across worker processes
+
+    Each shard runs the same operation in its own process, with its own
+    event loop, connection pools and signer, so signing, parsing and
+    logging use every core. Progress and metrics are collected while the
+    shards run, and their summaries are combined into one ExecutionStats.
+    """
+    
+    PROGRESS_INTERVAL = 2.0
+    
+    def __init__(self, shards: int):
+        self.shards = max(1, shards)
+    
+    def split(self, wallets: List[Wallet], proxies: List[str]) -> List[Tuple[List[Wallet], List[str]]]:
+        """Round-robin shards; each wallet keeps the proxy it would have had in a single process"""
+        parts = []
+        for shard in range(self.shards):
+            indices = range(shard, len(wallets), self.shards)
+            shard_proxies = [proxies[idx % len(proxies)] for idx in indices] if proxies else []
+            parts.append(([wallets[idx] for idx in indices], shard_proxies))
+        return [part for part in parts if part[0]]
+    
+    async def run(self, args: argparse.Namespace, wallets: List[Wallet], proxies: List[str],
+                  token_list: List[Token], captcha_token: str) -> ExecutionStats:
+        parts = self.split(wallets, proxies)
+        config = _config_snapshot()
+        # Per-shard limits so the totals stay what the user configured
+        config['PerformanceConfig.MAX_CONCURRENT_WALLETS'] = max(1, -(-PerformanceConfig.MAX_CONCURRENT_WALLETS // len(parts)))
+        config['PerformanceConfig.ENDPOINT_RATE_LIMIT'] = PerformanceConfig.ENDPOINT_RATE_LIMIT / len(parts)
+        config['PerformanceConfig.SIGNING_WORKERS'] = 1
+        
+        payloads = [{
+            'shard': shard,
+            'shards': len(parts),
+            'config': config,
+            'console': Logger.backend.console,
+            'log_json': getattr(args, 'log_json', None),
+            'args': vars(args),
+            'token_list': token_list,
+            'captcha_token': captcha_token,
+            'proxies': shard_proxies,
+            'wallets': [(w.private_key, w.name, w.address if w.has_address else None) for w in shard_wallets],
+        } for shard, (shard_wallets, shard_proxies) in enumerate(parts)]
+        
+        Logger.info(None, f'Running {len(wallets)} wallet(s) in {len(parts)} shard process(es)')
+        Logger.flush()
+        context = multiprocessing.get_context('spawn')
+        progress = context.Queue()
+        loop = asyncio.get_running_loop()
+        latest: Dict[int, Dict] = {}
+        metrics = Metrics.shared()
+        stats = ExecutionStats()
+        stats.total_wallets = len(wallets)
+        
+        pool = ProcessPoolExecutor(max_workers=len(parts), mp_context=context,
+                                   initializer=_init_shard_worker, initargs=(progress,))
+        try:
+            futures = [loop.run_in_executor(pool, run_shard, payload) for payload in payloads]
+            pending = set(futures)
+            while pending:
+                _, pending = await asyncio.wait(pending, timeout=self.PROGRESS_INTERVAL)
+                self._drain(progress, latest, metrics)
+                if pending:
+                    self._report_progress(latest, len(wallets))
+            results = [future.result() for future in futures]
+        finally:
+            pool.shutdown(wait=True)
+        
+        self._drain(progress, latest, metrics)
+        metrics.shard_snapshots = {}
+        for result in results:
+            stats.absorb(result['summary'])
+            metrics.merge(result['metrics'])
+            SessionCache.shared().merge(result['sessions'])
+            for fingerprint, address in result['addresses'].items():
+                AddressCache.shared().put(fingerprint, address)
+            Profiler.shared().merge(result['phases'], result['profile_files'])
+        AddressCache.shared().flush()
+        
+        stats.finish()
+        stats.report(f'{args.operation} ({len(parts)} shards)')
+        return stats
+    
+    @staticmethod
+    def _drain(progress, latest: Dict[int, Dict], metrics: Metrics):
+        while True:
+            try:
+                shard, summary, snapshot = progress.get_nowait()
+            except queue.Empty:
+                return
+            latest[shard] = summary
+            metrics.shard_snapshots[shard] = snapshot
+    
+    @staticmethod
+    def _report_progress(latest: Dict[int, Dict], total: int):
+        if not latest:
+            return
+        done = sum(s['wallets_ok'] + s['wallets_failed'] for s in latest.values())
+        ok = sum(s['ops_ok'] for s in latest.values())
+        failed = sum(s['ops_failed'] for s in latest.values())
+        Logger.info(None, f'Progress: {done}/{total} wallets, ops: {ok} ok / {failed} failed')
+
+async def run_headless(args: argparse.Namespace, wallets: List[Wallet], proxies: List[str],
+                       token_cache: TokenCache, captcha_token: str) -> int:
+    """Run a single operation non-interactively; returns the exit code
+
+    Exit codes: 0 all operations succeeded, 2 some operations failed or
+    every operation was skipped, 1 the run could not start (bad options or
+    a rejected plan).
+    """
+    summary: Dict = {'operation': args.operation, 'tx_count': args.tx_count, 'wallets': len(wallets)}
+    if PerformanceConfig.SIMULATE:
+        summary['simulated'] = True
+    shards = min(args.shards or PerformanceConfig.SHARDS, len(wallets))
+    try:
+        specs = headless_specs(args, token_cache.tokens)
+        if shards > 1:
+            # Plan once here so a bad plan is rejected before any process starts
+            TradePlanner(specs, token_cache.table, args.tx_count).plan(len(wallets))
+            stats = await ShardCoordinator(shards).run(args, wallets, proxies, token_cache.tokens, captcha_token)
+            summary['shards'] = shards
+            return finish_headless(summary, stats, args.summary_file)
+        resume_window = PerformanceConfig.AUTO_ALL_PERIOD / 2 if args.operation == 'auto_all' else None
+        pipeline = OperationPipeline(specs, token_cache.tokens, captcha_token, args.tx_count, token_cache=token_cache,
+                                     resume_window=resume_window)
+        stats = await pipeline.run(wallets, proxies, args.operation)
+    except PlanError as e:
+        Logger.security(f'{args.operation} plan rejected: {str(e)}')
+        summary.update({'status': 'error', 'error': str(e)})
+        emit_summary(summary, args.summary_file)
+        return 1
+    
+    return finish_headless(summary, stats, args.summary_file)
+
+def finish_headless(summary: Dict, stats: ExecutionStats, summary_file: Optional[str]) -> int:
+    """Emit the final summary and map the outcome to an exit code
+
+    A run whose every operation was skipped as infeasible sent nothing,
+    so it is reported as 'skipped' rather than 'ok'.
+    """
+    summary.update(stats.to_dict())
+    if stats.ops_failed or stats.wallets_failed:
+        summary['status'] = 'partial'
+    elif stats.ops_skipped and not stats.ops_ok:
+        summary['status'] = 'skipped'
+    else:
+        summary['status'] = 'ok'
+    profile = Profiler.shared().finish()
+    if profile is not None:
+        summary['profile'] = profile
+    emit_summary(summary, summary_file)
+    return 0 if summary['status'] == 'ok' else 2
+
+async def menu_loop(wallets: List[Wallet], proxies: List[str], token_cache: TokenCache, captcha_token: str, fetch_tokens):
+    """Interactive main menu
+
+    The background refresh cannot run while the menu waits for input, so
+    a stale token list is refetched before each operation is planned.
+    """
     transaction_count = 1
     
     while True:
         display_menu()
-        status_text = f"TX Count: {Colors.GREEN}{transaction_count}{Colors.RESET}"
+        status_text = f"TX Count: {Colors.GREEN}{transaction_count}{Colors.RESET}  Concurrency: {Colors.GREEN}{PerformanceConfig.MAX_CONCURRENT_WALLETS}{Colors.RESET}"
         print(f"  {status_text}\n")
         
-        choice = input(f"{Colors.CYAN}>{Colors.RESET} Select option: ").strip()
+        choice = Logger.prompt(f"{Colors.CYAN}>{Colors.RESET} Select option: ").strip()
+        
+        if choice in ('1', '2', '3', '4', '5', '6', '7'):
+            try:
+                if await token_cache.refresh(fetch_tokens):
+                    Logger.info(None, f'Token prices refreshed ({len(token_cache.tokens)} tokens)')
+            except Exception as e:
+                Logger.warning(None, f'Token refresh failed, using prices from {token_cache.age:.0f}s ago: {str(e)}')
         
         if choice == '0':
             Logger.info(None, 'Shutting down bot...')
@@ -1014,11 +3808,11 @@ async def main():
         
         elif choice == '9':
             display_security_settings()
-            input(f"\n{Colors.YELLOW}Press Enter to continue...{Colors.RESET}")
+            Logger.prompt(f"\n{Colors.YELLOW}Press Enter to continue...{Colors.RESET}")
         
         elif choice == '8':
             try:
-                new_count = int(input(f"{Colors.CYAN}>{Colors.RESET} Enter TX count (1-100): "))
+                new_count = int(Logger.prompt(f"{Colors.CYAN}>{Colors.RESET} Enter TX count (1-100): "))
                 if 1 <= new_count <= 100:
                     transaction_count = new_count
                     Logger.success(None, f'TX count set to {transaction_count}')
@@ -1026,47 +3820,53 @@ async def main():
                     Logger.error(None, 'Invalid range. Must be 1-100')
             except ValueError:
                 Logger.error(None, 'Invalid input. Enter a number')
-            input(f"\n{Colors.YELLOW}Press Enter to continue...{Colors.RESET}")
+            Logger.prompt(f"\n{Colors.YELLOW}Press Enter to continue...{Colors.RESET}")
         
         elif choice == '1':
-            await process_auto_swap(wallets, proxies, token_list, captcha_token, transaction_count)
-            input(f"\n{Colors.YELLOW}Press Enter to continue...{Colors.RESET}")
+            await process_auto_swap(wallets, proxies, token_cache.tokens, captcha_token, transaction_count)
+            Logger.prompt(f"\n{Colors.YELLOW}Press Enter to continue...{Colors.RESET}")
 
         elif choice == '2':
-            await process_manual_swap(wallets, proxies, token_list, captcha_token, transaction_count)
-            input(f"\n{Colors.YELLOW}Press Enter to continue...{Colors.RESET}")
+            await process_manual_swap(wallets, proxies, token_cache.tokens, captcha_token, transaction_count)
+            Logger.prompt(f"\n{Colors.YELLOW}Press Enter to continue...{Colors.RESET}")
 
         elif choice == '3':
-            await process_supply(wallets, proxies, token_list, captcha_token, transaction_count)
-            input(f"\n{Colors.YELLOW}Press Enter to continue...{Colors.RESET}")
+            await process_supply(wallets, proxies, token_cache.tokens, captcha_token, transaction_count)
+            Logger.prompt(f"\n{Colors.YELLOW}Press Enter to continue...{Colors.RESET}")
 
         elif choice == '4':
-            await process_withdraw(wallets, proxies, token_list, captcha_token, transaction_count)
-            input(f"\n{Colors.YELLOW}Press Enter to continue...{Colors.RESET}")
+            await process_withdraw(wallets, proxies, token_cache.tokens, captcha_token, transaction_count)
+            Logger.prompt(f"\n{Colors.YELLOW}Press Enter to continue...{Colors.RESET}")
 
         elif choice == '5':
-            await process_borrow(wallets, proxies, token_list, captcha_token, transaction_count)
-            input(f"\n{Colors.YELLOW}Press Enter to continue...{Colors.RESET}")
+            await process_borrow(wallets, proxies, token_cache.tokens, captcha_token, transaction_count)
+            Logger.prompt(f"\n{Colors.YELLOW}Press Enter to continue...{Colors.RESET}")
 
         elif choice == '6':
-            await process_repay(wallets, proxies, token_list, captcha_token, transaction_count)
-            input(f"\n{Colors.YELLOW}Press Enter to continue...{Colors.RESET}")
+            await process_repay(wallets, proxies, token_cache.tokens, captcha_token, transaction_count)
+            Logger.prompt(f"\n{Colors.YELLOW}Press Enter to continue...{Colors.RESET}")
 
         elif choice == '7':
-            await process_auto_all(wallets, proxies, token_list, captcha_token, transaction_count)
-            input(f"\n{Colors.YELLOW}Press Enter to continue...{Colors.RESET}")
+            await process_auto_all(wallets, proxies, token_cache.tokens, captcha_token, transaction_count, token_cache)
+            Logger.prompt(f"\n{Colors.YELLOW}Press Enter to continue...{Colors.RESET}")
         
         else:
             Logger.warning(None, 'Invalid option. Please try again.')
-            input(f"\n{Colors.YELLOW}Press Enter to continue...{Colors.RESET}")
+            Logger.prompt(f"\n{Colors.YELLOW}Press Enter to continue...{Colors.RESET}")
         
         Logger.clear_terminal()
         display_banner()
 
 if __name__ == '__main__':
+    exit_code = 1
     try:
-        asyncio.run(main())
+        exit_code = asyncio.run(main())
     except KeyboardInterrupt:
         print(f"\n{Colors.YELLOW}Bot interrupted by user{Colors.RESET}")
+        exit_code = 130
     except Exception as e:
         Logger.error(None, f'Critical error: {str(e)}')
+    finally:
+        SessionCache.shared().flush()
+        Logger.flush()
+    sys.exit(exit_code)
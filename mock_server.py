@@ -0,0 +1,103 @@
+import asyncio
+import argparse
+from typing import Dict, Optional
+from aiohttp import web
+
+from bot import SIMULATED_TOKENS as TOKENS, SimulatedBackend
+
+class MockConfig:
+    """Behaviour knobs for the mock server"""
+
+    def __init__(self, latency: float = 0.05, jitter: float = 0.02, error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0, retry_after: float = 1.0, seed: Optional[int] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.seed = seed
+
+class MockBlockStreetServer:
+    """Local stand-in for the BlockStreet API endpoints used by bot.py
+
+    Responses come from the same SimulatedBackend that --simulate uses
+    in-process, served over real HTTP.
+    """
+
+    def __init__(self, config: Optional[MockConfig] = None):
+        self.config = config or MockConfig()
+        config = self.config
+        self.backend = SimulatedBackend(config.latency, config.jitter, config.error_rate, config.rate_limit_rate,
+                                        config.retry_after, config.seed, TOKENS)
+        self._runner: Optional[web.AppRunner] = None
+
+    @property
+    def request_count(self) -> int:
+        return self.backend.request_count
+
+    def build_app(self) -> web.Application:
+        app = web.Application(middlewares=[self._chaos_middleware])
+        for method, endpoint in self.backend.routes:
+            app.router.add_route(method, f'/api{endpoint}', self.dispatch)
+        return app
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        """Start serving in the current event loop; returns the API base URL"""
+        self._runner = web.AppRunner(self.build_app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_port = self._runner.addresses[0][1]
+        return f'http://{host}:{bound_port}/api'
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    @web.middleware
+    async def _chaos_middleware(self, request: web.Request, handler):
+        delay = self.backend.delay()
+        if delay:
+            await asyncio.sleep(delay)
+        injected = self.backend.chaos()
+        if injected is not None:
+            return self._response(*injected)
+        return await handler(request)
+
+    @staticmethod
+    def _response(status: int, body: Dict, headers: Dict[str, str]) -> web.Response:
+        return web.json_response(body, status=status, headers=headers)
+
+    async def _payload(self, request: web.Request) -> Dict:
+        if request.content_type == 'application/json':
+            return await request.json()
+        return dict(await request.post())
+
+    async def dispatch(self, request: web.Request) -> web.Response:
+        endpoint = request.path[len('/api'):]
+        payload = await self._payload(request) if request.method == 'POST' else {}
+        return self._response(*self.backend.handle(request.method, endpoint, payload, request.headers.get('Cookie', '')))
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Local mock of the BlockStreet API')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0.05, help='mean response latency in seconds')
+    parser.add_argument('--jitter', type=float, default=0.02, help='latency standard deviation in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests answered with HTTP 500')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='fraction of requests answered with HTTP 429')
+    parser.add_argument('--retry-after', type=float, default=1.0, help='Retry-After value sent with 429 responses')
+    parser.add_argument('--seed', type=int, default=None)
+    return parser.parse_args(argv)
+
+def main():
+    args = parse_args()
+    config = MockConfig(args.latency, args.jitter, args.error_rate, args.rate_limit_rate, args.retry_after, args.seed)
+    server = MockBlockStreetServer(config)
+    print(f'Mock BlockStreet API on http://{args.host}:{args.port}/api')
+    print(f'Point the bot at it with BLOCKSTREET_API_URL=http://{args.host}:{args.port}/api')
+    web.run_app(server.build_app(), host=args.host, port=args.port, print=None, access_log=None)
+
+if __name__ == '__main__':
+    main()